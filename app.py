@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
-import tempfile
-import hashlib
-import altair as alt
-import plotly.graph_objects as go
-from supabase import create_client, Client
-from demoparser2 import DemoParser
+import json
+from config import criar_banco
+from jogadores import AMIGOS
+import armazem_eventos
+import cache_dados
+import medicoes
+from rating import META_PARTIDAS, rating_partida
+from paginas import JANELAS_RANKING, MAPAS_OFICIAIS, VISAO_GERAL, mapas_do_grupo, preparar_historico, preparar_mapas, preparar_ranking
 
 # --- 1. CONFIGURAÇÃO E ESTILOS (TEMA CS2) ---
 st.set_page_config(page_title="CS2 Hub", page_icon="🔫", layout="wide")
@@ -35,266 +38,71 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-try:
-    SUPABASE_URL = st.secrets["supabase"]["url"]
-    SUPABASE_KEY = st.secrets["supabase"]["key"]
-except FileNotFoundError:
-    st.error("❌ Erro: Secrets não encontrados.")
+# --- 2. RECURSOS COMPARTILHADOS ---
+# Criados uma vez por processo do Streamlit e reaproveitados em todos os reruns e sessões.
+# plotly e demoparser2 (via ingestao) só são importados nas páginas que usam.
+@st.cache_resource
+def obter_banco():
+    try: secrets = st.secrets.to_dict()
+    except FileNotFoundError: secrets = {}
+    return criar_banco(secrets)
+
+@st.cache_resource
+def nomes_jogadores():
+    return tuple(AMIGOS.keys())
+
+@st.cache_resource
+def mapas_oficiais():
+    return tuple(MAPAS_OFICIAIS)
+
+try: bd = obter_banco()
+except RuntimeError as e:
+    st.error(f"❌ Erro: Secrets não encontrados. {e}")
     st.stop()
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# --- 2. LISTA DE AMIGOS ---
-AMIGOS = {
-    "Ph (Ph1L)": ["76561198301569089", "76561198051052379"],
-    "Pablo (Cyrax)": ["76561198143002755", "76561198446160415"],
-    "Bruno (Safadinha)": ["76561198187604726"],
-    "Daniel (Ocharadas)": ["76561199062357951"],
-    "LEO (Trewan)": ["76561198160033077"],
-    "FERNANDO (Nandin)": ["76561198185508959"],
-    "DG (dgtremsz)": ["76561199402154960"],
-    "Arlon (M4CH)": ["76561197978110112"],
-}
-
 # --- 3. FUNÇÕES AUXILIARES ---
 
-def normalizar_time(valor):
-    try:
-        s = str(valor).upper().strip().replace('.0', '')
-        if s in ['CT', '3']: return 3
-        if s in ['T', 'TERRORIST', '2']: return 2
-        return None
-    except: return None
-
-def calcular_hash(arquivo_bytes):
-    return hashlib.md5(arquivo_bytes).hexdigest()
-
-def demo_ja_processada(file_hash):
-    try:
-        response = supabase.table('processed_matches').select('match_hash').eq('match_hash', file_hash).execute()
-        return len(response.data) > 0
-    except: return False
-
-def registrar_demo(file_hash):
-    try:
-        supabase.table('processed_matches').insert({'match_hash': file_hash}).execute()
-    except: pass
-
-def ler_evento(parser, nome_evento):
-    try:
-        dados = parser.parse_events([nome_evento])
-        if isinstance(dados, list) and len(dados) > 0:
-            return pd.DataFrame(dados[0][1])
-        return pd.DataFrame(dados)
-    except: return pd.DataFrame()
-
 def arquivar_e_resetar(nome_temporada):
     try:
-        stats_atuais = supabase.table('player_stats').select("*").execute().data
-        mapas_atuais = supabase.table('player_map_stats').select("*").execute().data
-        
-        if stats_atuais:
-            for row in stats_atuais:
-                row['season_name'] = nome_temporada
-                if 'id' in row: del row['id']
-                if 'created_at' in row: del row['created_at']
-            supabase.table('history_player_stats').insert(stats_atuais).execute()
-
-        if mapas_atuais:
-            for row in mapas_atuais:
-                row['season_name'] = nome_temporada
-                if 'id' in row: del row['id']
-            supabase.table('history_map_stats').insert(mapas_atuais).execute()
-
-        supabase.table('player_stats').delete().gte('matches', 0).execute()
-        try: supabase.table('player_map_stats').delete().gte('matches', 0).execute() 
-        except: pass
-        supabase.table('processed_matches').delete().neq('match_hash', '0').execute()
+        bd.arquivar_e_resetar(nome_temporada)
+        cache_dados.invalidar()
         return True
     except Exception as e:
         st.error(f"Erro ao arquivar: {e}")
         return False
 
-def atualizar_banco(stats_novos, mapa_atual):
-    for i, (nick, dados) in enumerate(stats_novos.items()):
-        if dados['Matches'] > 0:
-            response = supabase.table('player_stats').select("*").eq('nickname', nick).execute()
-            novos_dados = {
-                "kills": dados['Kills'], "deaths": dados['Deaths'], "assists": dados['Assists'],
-                "matches": dados['Matches'], "wins": dados['Wins'], 
-                "headshots": dados['Headshots'], "enemies_flashed": dados['EnemiesFlashed'], 
-                "utility_damage": dados['UtilityDamage'], "total_damage": dados['TotalDamage'],
-                "rounds_played": dados['RoundsPlayed']
-            }
-            try:
-                if response.data:
-                    atual = response.data[0]
-                    for k in novos_dados: novos_dados[k] += atual.get(k, 0)
-                    supabase.table('player_stats').update(novos_dados).eq('nickname', nick).execute()
-                else:
-                    novos_dados["nickname"] = nick
-                    supabase.table('player_stats').insert(novos_dados).execute()
-            except Exception as e: st.error(f"Erro BD (Geral): {e}")
-
-            if mapa_atual:
-                try:
-                    resp_map = supabase.table('player_map_stats').select("*").eq('nickname', nick).eq('map_name', mapa_atual).execute()
-                    if resp_map.data:
-                        atual_map = resp_map.data[0]
-                        supabase.table('player_map_stats').update({
-                            "matches": atual_map['matches'] + 1,
-                            "wins": atual_map['wins'] + (1 if dados['Wins'] > 0 else 0)
-                        }).eq('id', atual_map['id']).execute()
-                    else:
-                        supabase.table('player_map_stats').insert({
-                            "nickname": nick, "map_name": mapa_atual,
-                            "matches": 1, "wins": 1 if dados['Wins'] > 0 else 0
-                        }).execute()
-                except: pass
-
-def processar_demo(arquivo_upload):
-    arquivo_bytes = arquivo_upload.read()
-    file_hash = calcular_hash(arquivo_bytes)
-    
-    if demo_ja_processada(file_hash):
-        st.error("⛔ Demo Duplicada!")
-        return False, None
-
-    tfile = tempfile.NamedTemporaryFile(delete=False, suffix=".dem")
-    tfile.write(arquivo_bytes)
-    caminho_temp = tfile.name
-    tfile.close()
-    
-    stats_partida = {nome: {"Kills": 0, "Deaths": 0, "Assists": 0, "Matches": 0, "Wins": 0, 
-                            "Headshots": 0, "EnemiesFlashed": 0, "UtilityDamage": 0, 
-                            "TotalDamage": 0, "RoundsPlayed": 0} for nome in AMIGOS.keys()}
-    sucesso = False
-    mapa_nome = "Desconhecido"
-
+def relatorio_partida(stats_partida, mapa_nome, rounds=None):
+    rows = []
+    for k, v in stats_partida.items():
+        if v['Matches'] > 0:
+            rows.append({
+                "nickname": k, "mapa": mapa_nome, "kills": v['Kills'], "deaths": v['Deaths'], "assists": v['Assists'], "wins": v['Wins'], "matches": v['Matches']
+            })
+    df = pd.DataFrame(rows)
+    if rounds is not None and not rounds.empty and not df.empty:
+        from por_round import resumo_rounds
+        df = df.merge(resumo_rounds(rounds).astype({"nickname": str}), on="nickname", how="left")
+    return df
+
+def processar_demos(arquivos, ao_atualizar):
+    from ingestao import STATUS_DUPLICADA, analise_em_cache, ingerir_demos, salvar_upload
+    demos = []
     try:
-        parser = DemoParser(caminho_temp)
-        try:
-            header = parser.parse_header()
-            if "map_name" in header: mapa_nome = header["map_name"].replace("de_", "").capitalize()
-        except: pass
-
-        df_round = ler_evento(parser, "round_end")
-        df_death = ler_evento(parser, "player_death")
-        df_blind = ler_evento(parser, "player_blind")
-        df_hurt = ler_evento(parser, "player_hurt")
-        df_team = ler_evento(parser, "player_team")
-        df_item = ler_evento(parser, "item_pickup")
-
-        col_atk_id = next((c for c in df_death.columns if c in ['attacker_steamid', 'attacker_xuid']), None)
-        col_vic_id = next((c for c in df_death.columns if c in ['user_steamid', 'user_xuid']), None)
-        col_ass_id = next((c for c in df_death.columns if c in ['assister_steamid', 'assister_xuid']), None)
-        col_team_id = next((c for c in df_team.columns if c in ['user_steamid', 'steamid']), None)
-        col_item_id = next((c for c in df_item.columns if c in ['user_steamid', 'steamid']), None)
-
-        if not col_atk_id: return False, None
-
-        for df in [df_death, df_blind, df_hurt, df_team, df_item]:
-            for col in df.columns:
-                if 'steamid' in col or 'xuid' in col:
-                    df[col] = df[col].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-
-        time_history = {}
-        def adicionar_historico(df_source, col_uid, col_team, col_oldteam=None):
-            if not df_source.empty and col_uid and col_team in df_source.columns:
-                df_sorted = df_source.sort_values('tick')
-                for _, row in df_sorted.iterrows():
-                    uid = row[col_uid]
-                    new_t = normalizar_time(row.get(col_team))
-                    if uid and new_t:
-                        if uid not in time_history: 
-                            time_history[uid] = []
-                            if col_oldteam:
-                                old_t = normalizar_time(row.get(col_oldteam))
-                                if old_t: time_history[uid].append({'tick': 0, 'team': old_t})
-                        time_history[uid].append({'tick': row['tick'], 'team': new_t})
-
-        adicionar_historico(df_team, col_team_id, 'team', 'oldteam')
-        adicionar_historico(df_item, col_item_id, 'team_num')
-        c_death_team = next((c for c in df_death.columns if c in ['attacker_team_num', 'team_num']), None)
-        adicionar_historico(df_death, col_atk_id, c_death_team)
-
-        rounds_data = []
-        if not df_round.empty and 'winner' in df_round.columns:
-            for _, row in df_round.iterrows():
-                w = normalizar_time(row['winner'])
-                if w: rounds_data.append({'tick': row['tick'], 'winner': w})
-        total_rounds_match = len(rounds_data)
-
-        for nome_exibicao, lista_ids in AMIGOS.items():
-            lista_ids = [str(uid).strip() for uid in lista_ids]
-            if not df_death.empty and col_atk_id:
-                my_kills = df_death[df_death[col_atk_id].isin(lista_ids)]
-                stats_partida[nome_exibicao]["Kills"] = len(my_kills)
-                if 'headshot' in my_kills.columns: stats_partida[nome_exibicao]["Headshots"] = len(my_kills[my_kills['headshot']==True])
-                if col_vic_id: stats_partida[nome_exibicao]["Deaths"] = len(df_death[df_death[col_vic_id].isin(lista_ids)])
-                if col_ass_id: stats_partida[nome_exibicao]["Assists"] = len(df_death[df_death[col_ass_id].isin(lista_ids)])
-
-            if not df_blind.empty:
-                c_blind = next((c for c in df_blind.columns if c in ['attacker_steamid', 'attacker_xuid']), None)
-                if c_blind:
-                    df_blind[c_blind] = df_blind[c_blind].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-                    stats_partida[nome_exibicao]["EnemiesFlashed"] = len(df_blind[df_blind[c_blind].isin(lista_ids)])
-            
-            if not df_hurt.empty:
-                c_hurt = next((c for c in df_hurt.columns if c in ['attacker_steamid', 'attacker_xuid']), None)
-                if c_hurt and 'dmg_health' in df_hurt.columns:
-                    df_hurt[c_hurt] = df_hurt[c_hurt].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-                    meu_dano = df_hurt[df_hurt[c_hurt].isin(lista_ids)]
-                    stats_partida[nome_exibicao]["TotalDamage"] = int(meu_dano['dmg_health'].sum())
-                    if 'weapon' in df_hurt.columns:
-                        dmg_util = meu_dano[meu_dano['weapon'].isin(['hegrenade', 'inferno', 'incgrenade', 'molotov'])]
-                        stats_partida[nome_exibicao]["UtilityDamage"] = int(dmg_util['dmg_health'].sum())
-
-            meus_pontos = 0
-            total_rounds_jogados = 0 
-            minha_timeline = []
-            for uid in lista_ids:
-                if uid in time_history: minha_timeline.extend(time_history[uid])
-            minha_timeline.sort(key=lambda x: x['tick'])
-
-            if rounds_data and minha_timeline:
-                for r in rounds_data:
-                    r_tick = r['tick']
-                    r_winner = r['winner']
-                    meu_time = None
-                    passado = [h for h in minha_timeline if h['tick'] <= r_tick]
-                    if passado: meu_time = passado[-1]['team']
-                    if meu_time:
-                        total_rounds_jogados += 1
-                        if meu_time == r_winner: meus_pontos += 1
-            
-            if total_rounds_jogados == 0: total_rounds_jogados = total_rounds_match
-            stats_partida[nome_exibicao]["RoundsPlayed"] = total_rounds_jogados
-
-            if total_rounds_jogados > 0 and meus_pontos > (total_rounds_jogados / 2):
-                stats_partida[nome_exibicao]["Wins"] = 1
-
-            if (stats_partida[nome_exibicao]["Kills"] > 0 or stats_partida[nome_exibicao]["Deaths"] > 0 or stats_partida[nome_exibicao]["UtilityDamage"] > 0):
-                stats_partida[nome_exibicao]["Matches"] = 1
-                sucesso = True
-
-        if sucesso:
-            atualizar_banco(stats_partida, mapa_nome)
-            registrar_demo(file_hash)
-            rows = []
-            for k, v in stats_partida.items():
-                if v['Matches'] > 0:
-                    rows.append({
-                        "nickname": k, "mapa": mapa_nome, "kills": v['Kills'], "deaths": v['Deaths'], "assists": v['Assists'], "wins": v['Wins'], "matches": v['Matches']
-                    })
-            return True, pd.DataFrame(rows)
-        else: return False, None
-
-    except Exception as e:
-        st.error(f"Erro Fatal: {e}")
-        return False, None
+        for arquivo in arquivos:
+            caminho, file_hash = salvar_upload(arquivo)
+            demos.append({"arquivo": arquivo.name, "caminho": caminho, "hash": file_hash})
+        status, partidas = ingerir_demos(demos, bd, AMIGOS, ao_atualizar)
+        if partidas: cache_dados.invalidar()
+        # demo já enviada antes: o relatório sai do armazém, sem reprocessar
+        relatorios = [(p["arquivo"], relatorio_partida(p["stats"], p["mapa"], p["rounds"])) for p in partidas]
+        for demo, linha in zip(demos, status):
+            if linha["status"] != STATUS_DUPLICADA: continue
+            salvo = analise_em_cache(demo["hash"], AMIGOS, armazem_eventos.DIRETORIO_EVENTOS)
+            if salvo and salvo["stats"]: relatorios.append((demo["arquivo"], relatorio_partida(salvo["stats"], salvo["mapa"], salvo["rounds"])))
+        return status, len(partidas), relatorios
     finally:
-        if os.path.exists(caminho_temp): os.remove(caminho_temp)
+        for demo in demos:
+            if os.path.exists(demo["caminho"]): os.remove(demo["caminho"])
 
 # --- 4. INTERFACE ---
 st.sidebar.title("Navegação")
@@ -302,58 +110,57 @@ pagina = st.sidebar.radio("Ir para:", ["📤 Upload & Partida", "🏆 Ranking Gl
 
 if pagina == "📤 Upload & Partida":
     st.title("📤 Upload de Demo")
-    st.markdown("Suba o arquivo `.dem` para analisar a partida e enviá-la ao Ranking.")
+    st.markdown("Suba um ou mais arquivos `.dem` para analisar as partidas e enviá-las ao Ranking.")
     
-    arquivo = st.file_uploader("Arraste o arquivo aqui", type=["dem"])
-    if "df_partida_atual" not in st.session_state: st.session_state["df_partida_atual"] = None
-
-    if arquivo:
-        if st.button("🚀 Processar Partida"):
-            with st.spinner("Analisando demo e mapa..."):
-                sucesso, df_resultado = processar_demo(arquivo)
-                if sucesso:
-                    st.success(f"✅ Partida no mapa **{df_resultado['mapa'].iloc[0]}** salva!")
-                    st.session_state["df_partida_atual"] = df_resultado
-                    st.balloons()
+    arquivos = st.file_uploader("Arraste os arquivos aqui", type=["dem"], accept_multiple_files=True)
+    if "partidas_processadas" not in st.session_state: st.session_state["partidas_processadas"] = []
+
+    if arquivos:
+        if st.button("🚀 Processar Partidas"):
+            from ingestao import EM_ANDAMENTO
+            barra = st.progress(0.0, text="Analisando demos e mapas...")
+            tabela_status = st.empty()
+            def ao_atualizar(status):
+                concluidas = sum(1 for s in status if s["status"] not in EM_ANDAMENTO)
+                barra.progress(concluidas / len(status), text=f"{concluidas}/{len(status)} demos concluídas")
+                tabela_status.dataframe(pd.DataFrame(status), hide_index=True, use_container_width=True)
+
+            status, salvas, relatorios = processar_demos(arquivos, ao_atualizar)
+            if relatorios: st.session_state["partidas_processadas"] = relatorios
+            if salvas:
+                st.success(f"✅ {salvas} partida(s) salva(s)!")
+                st.balloons()
     
-    if st.session_state["df_partida_atual"] is not None:
+    if st.session_state["partidas_processadas"]:
         st.divider()
-        st.subheader("📊 Relatório da Partida Atual")
-        df = st.session_state["df_partida_atual"].copy()
-        df['Rating'] = df.apply(lambda x: (x['kills'] + (x['assists']*0.4)) / x['deaths'] if x['deaths'] > 0 else x['kills'], axis=1)
-        df['Resultado'] = df['wins'].apply(lambda x: "🏆 Vitória" if x == 1 else "💀 Derrota")
+        st.subheader("📊 Relatório das Partidas")
+        partidas = dict(st.session_state["partidas_processadas"])
+        nome_partida = st.selectbox("Partida:", list(partidas.keys())) if len(partidas) > 1 else next(iter(partidas))
+        df = partidas[nome_partida].copy()
+        st.caption(f"🗺️ Mapa: **{df['mapa'].iloc[0]}**")
+        df['Rating'] = rating_partida(df)
+        df['Resultado'] = np.where(df['wins'] == 1, "🏆 Vitória", "💀 Derrota")
         df = df.sort_values(by='Rating', ascending=False)
-        st.dataframe(df[['nickname', 'Resultado', 'Rating', 'kills', 'assists', 'deaths']], hide_index=True, use_container_width=True)
+        colunas = ['nickname', 'Resultado', 'Rating', 'kills', 'assists', 'deaths'] + [c for c in ['ADR', 'KAST', 'aberturas', 'trade_kills', 'clutches'] if c in df.columns]
+        st.dataframe(df[colunas], hide_index=True, use_container_width=True,
+                     column_config={"ADR": st.column_config.NumberColumn(format="%.1f"), "KAST": st.column_config.NumberColumn("KAST %", format="%.0f")})
 
 elif pagina == "🏆 Ranking Global":
     st.title("🏆 Ranking Global")
+    janela = st.radio("Período", list(JANELAS_RANKING), horizontal=True, label_visibility="collapsed")
+    argumentos = JANELAS_RANKING[janela]
+    # na janela de N partidas ninguém passa de N jogos: a meta de consistência acompanha
+    meta = min(META_PARTIDAS, argumentos.get("partidas", META_PARTIDAS)) if argumentos else META_PARTIDAS
     
     col_top1, col_top2 = st.columns([3, 1])
-    with col_top1: st.info("ℹ️ **Fator de Consistência:** Jogadores com menos de **50 partidas** sofrem penalidade.")
+    with col_top1: st.info(f"ℹ️ **Fator de Consistência:** Jogadores com menos de **{meta} partidas** sofrem penalidade.")
     with col_top2: 
-        if st.button("🔄 Atualizar Dados"): st.rerun()
-    
-    response = supabase.table('player_stats').select("*").execute()
-    db_data = pd.DataFrame(response.data) if response.data else pd.DataFrame()
+        if st.button("🔄 Atualizar Dados"):
+            cache_dados.invalidar()
+            st.rerun()
     
-    all_friends = pd.DataFrame({"nickname": list(AMIGOS.keys())})
-    if not db_data.empty: df = pd.merge(all_friends, db_data, on="nickname", how="left")
-    else: df = all_friends
-        
-    cols_stats = ['kills', 'deaths', 'assists', 'matches', 'wins', 'headshots', 'enemies_flashed', 'utility_damage', 'total_damage', 'rounds_played']
-    for c in cols_stats:
-        if c not in df.columns: df[c] = 0
-    df[cols_stats] = df[cols_stats].fillna(0)
-
-    df['KD'] = df.apply(lambda x: x['kills'] / x['deaths'] if x['deaths'] > 0 else x['kills'], axis=1)
-    df['WinRatePct'] = df.apply(lambda x: (x['wins'] / x['matches'] * 100) if x['matches'] > 0 else 0.0, axis=1)
-    df['ADR'] = df.apply(lambda x: x['total_damage'] / x['rounds_played'] if x['rounds_played'] > 0 else 0, axis=1)
-    df['RatingRaw'] = df.apply(lambda x: (x['kills'] + (x['assists']*0.4) + (x['enemies_flashed']*0.2) + (x['utility_damage']*0.01)) / x['deaths'] if x['deaths'] > 0 else x['kills'], axis=1)
-    df['Retrospecto'] = df.apply(lambda x: f"{int(x['wins'])} / {int(x['matches'])}", axis=1)
-    
-    META_PARTIDAS = 50 
-    df['Consistency'] = df['matches'].apply(lambda x: x / META_PARTIDAS if x < META_PARTIDAS else 1.0)
-    df['RatingFinal'] = df['RatingRaw'] * df['Consistency']
+    dados_stats = cache_dados.player_stats(bd) if argumentos is None else cache_dados.ranking_janela(bd, **argumentos)
+    with medicoes.etapa("pagina:ranking"): df = preparar_ranking(dados_stats, nomes_jogadores(), meta)
 
     with st.expander("🔍 Filtros", expanded=False):
         sel_players = st.multiselect("Filtrar Jogadores", options=df['nickname'].unique())
@@ -406,6 +213,44 @@ elif pagina == "🏆 Ranking Global":
         """)
 
     st.divider()
+    with st.expander("🛠️ Área Administrativa (Cache de Dados)"):
+        info_cache = cache_dados.cache.estatisticas()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Hits", info_cache["hits"])
+        c2.metric("Misses", info_cache["misses"])
+        c3.metric("Hit Rate", f"{info_cache['hit_rate']:.0%}")
+        c4.metric("Invalidações", info_cache["invalidacoes"])
+        st.caption(f"{info_cache['entradas']} consultas em cache • TTL de {info_cache['ttl']}s")
+        if st.button("🧹 Limpar Cache"):
+            cache_dados.invalidar()
+            st.rerun()
+
+    with st.expander("⏱️ Área Administrativa (Desempenho)"):
+        resumo = pd.DataFrame(medicoes.registro.resumo())
+        if resumo.empty: st.caption("Nenhuma medição ainda. Processe uma demo ou navegue pelas páginas.")
+        else:
+            st.dataframe(resumo, hide_index=True, use_container_width=True, column_config={
+                "etapa": "Etapa", "n": "Medições",
+                "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                "max_ms": st.column_config.NumberColumn("Máx (ms)", format="%.1f"),
+                "total_s": st.column_config.NumberColumn("Total (s)", format="%.2f"),
+            })
+        contadores = medicoes.registro.contadores()
+        acertos = contadores.get("cache:hit", 0) + contadores.get("cache:eventos", 0)
+        if acertos + contadores.get("cache:miss", 0):
+            st.metric("Cache de Partidas (Hit Rate)", f"{acertos / (acertos + contadores.get('cache:miss', 0)):.0%}",
+                      help="Demos reenviadas cujo resultado (ou eventos) já estava no armazém e não passaram pelo demoparser2.")
+        if contadores: st.caption(" • ".join(f"{nome}: {n}" for nome, n in sorted(contadores.items())))
+        exportado = medicoes.registro.exportar()
+        c1, c2, c3 = st.columns(3)
+        c1.download_button("📥 Medições (CSV)", pd.DataFrame(exportado["medicoes"], columns=["quando", "match_hash", "etapa", "segundos"]).to_csv(index=False),
+                           file_name="medicoes.csv", mime="text/csv")
+        c2.download_button("📥 Medições (JSON)", json.dumps(exportado), file_name="medicoes.json", mime="application/json")
+        if c3.button("🧹 Zerar Medições"):
+            medicoes.registro.limpar()
+            st.rerun()
+
     with st.expander("⚠️ Área Administrativa (Encerrar Temporada)"):
         st.warning("Atenção: Isso irá salvar os dados atuais no Histórico e zerar o Ranking Global.")
         nome_season = st.text_input("Nome da Temporada para Salvar (ex: Janeiro 2026)", placeholder="Digite o nome aqui...")
@@ -421,36 +266,28 @@ elif pagina == "🏆 Ranking Global":
 elif pagina == "🗺️ Estatísticas de Mapas":
     st.title("🗺️ Estatísticas de Mapas")
     
-    if st.button("🔄 Carregar Mapas"): st.rerun()
+    if st.button("🔄 Carregar Mapas"):
+        cache_dados.invalidar()
+        st.rerun()
+
+    def mapas_da_visao(visao):
+        # o banco já devolve uma linha por mapa (totais do grupo ou só as do jogador)
+        if visao == VISAO_GERAL: return mapas_do_grupo(cache_dados.totais_mapas(bd))
+        return cache_dados.mapas_jogador(bd, visao)
 
     try:
-        resp_maps = supabase.table('player_map_stats').select("*").execute()
-    except:
-        st.warning("⚠️ Tabela de mapas não encontrada.")
-        resp_maps = None
+        # a lista de jogadores e os mapas da visão do rerun anterior saem juntos do banco
+        visao_anterior = st.session_state.get("visao_mapas", VISAO_GERAL)
+        jogadores, _ = bd.executar_juntos([lambda: cache_dados.jogadores_mapas(bd), lambda: mapas_da_visao(visao_anterior)])
+    except Exception as e:
+        st.warning(f"⚠️ Tabela de mapas não encontrada. ({e})")
+        jogadores = []
     
-    if resp_maps and resp_maps.data:
-        df_maps = pd.DataFrame(resp_maps.data)
-        MAPAS_OFICIAIS = ['Inferno','Overpass',  'Ancient', 'Nuke', 'Dust2','Anubis', 'Mirage']
-        jogadores = sorted(df_maps['nickname'].unique())
-        jogador_selecionado = st.selectbox("Selecione a Visão:", ["Todos (Média Geral)"] + jogadores)
-        
-        if jogador_selecionado != "Todos (Média Geral)":
-            df_filtered = df_maps[df_maps['nickname'] == jogador_selecionado].copy()
-            titulo_grafico = f"Performance de {jogador_selecionado}"
-        else:
-            df_grp = df_maps.groupby('map_name')
-            df_matches = df_grp['matches'].max()
-            df_wins_sum = df_grp['wins'].sum()
-            df_matches_sum = df_grp['matches'].sum()
-            win_ratio = (df_wins_sum / df_matches_sum).fillna(0)
-            df_filtered = pd.DataFrame({'matches': df_matches, 'wins': (df_matches * win_ratio).astype(int)}).reset_index()
-            titulo_grafico = "Performance Geral do Grupo"
-
-        df_completo = pd.DataFrame({'map_name': MAPAS_OFICIAIS})
-        df_final = pd.merge(df_completo, df_filtered, on='map_name', how='left').fillna(0)
-        df_final['WinRate'] = df_final.apply(lambda x: (x['wins'] / x['matches'] * 100) if x['matches'] > 0 else 0, axis=1)
-        df_final['losses'] = df_final['matches'] - df_final['wins']
+    if jogadores:
+        import plotly.graph_objects as go
+        jogador_selecionado = st.selectbox("Selecione a Visão:", [VISAO_GERAL] + jogadores, key="visao_mapas")
+        linhas_mapas = mapas_da_visao(jogador_selecionado)
+        with medicoes.etapa("pagina:mapas"): df_final = preparar_mapas(linhas_mapas, list(mapas_oficiais()))
         
         col_radar, col_barras = st.columns([1, 1])
 
@@ -515,23 +352,17 @@ elif pagina == "📜 Histórico":
     st.title("📜 Histórico de Temporadas")
     
     try:
-        resp_history = supabase.table('history_player_stats').select("season_name").execute()
-        seasons = sorted(list(set([row['season_name'] for row in resp_history.data]))) if resp_history.data else []
-    except: seasons = []
+        # com uma temporada já escolhida, a lista e o ranking dela saem juntos do banco
+        anterior = st.session_state.get("temporada")
+        seasons = bd.executar_juntos([lambda: cache_dados.temporadas(bd)] + ([lambda: cache_dados.temporada(bd, anterior)] if anterior else []))[0]
+    except Exception as e:
+        st.warning(f"⚠️ Não foi possível carregar o histórico. ({e})")
+        seasons = []
 
     if seasons:
-        selected_season = st.selectbox("Selecione a Temporada:", seasons)
-        resp_data = supabase.table('history_player_stats').select("*").eq('season_name', selected_season).execute()
-        df_hist = pd.DataFrame(resp_data.data)
-        
-        df_hist['KD'] = df_hist.apply(lambda x: x['kills'] / x['deaths'] if x['deaths'] > 0 else x['kills'], axis=1)
-        df_hist['WinRatePct'] = df_hist.apply(lambda x: (x['wins'] / x['matches'] * 100) if x['matches'] > 0 else 0.0, axis=1)
-        df_hist['RatingRaw'] = df_hist.apply(lambda x: (x['kills'] + (x['assists']*0.4) + (x['enemies_flashed']*0.2) + (x['utility_damage']*0.01)) / x['deaths'] if x['deaths'] > 0 else x['kills'], axis=1)
-        META_PARTIDAS = 50 
-        df_hist['Consistency'] = df_hist['matches'].apply(lambda x: x / META_PARTIDAS if x < META_PARTIDAS else 1.0)
-        df_hist['RatingFinal'] = df_hist['RatingRaw'] * df_hist['Consistency']
-        
-        df_podium = df_hist.sort_values(by='RatingFinal', ascending=False).reset_index(drop=True)
+        selected_season = st.selectbox("Selecione a Temporada:", seasons, key="temporada")
+        dados_temporada = cache_dados.temporada(bd, selected_season)
+        with medicoes.etapa("pagina:historico"): df_podium = preparar_historico(dados_temporada, META_PARTIDAS)
 
         if not df_podium.empty:
             champion = df_podium.iloc[0]
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from extracao import EVENTOS, eh_coluna_id, limpar_steamid, tipar_evento
+
+# --- ARMAZÉM LOCAL DE EVENTOS POR PARTIDA (PARQUET) ---
+# Um diretório por match_hash com um .parquet por evento extraído e um meta.json.
+# Steamids e textos vão como dicionário (category) e ticks como int32, o que deixa
+# cada partida com poucos MB. Com isso dá para recalcular o ranking sem reprocessar demos,
+# e reenviar uma demo já analisada (ex.: depois de um erro no banco) não passa pelo parser.
+# O diretório é limitado por tamanho: passando do limite, saem as partidas usadas há mais tempo,
+# mas nunca as da temporada atual (ainda em processed_matches), que o recálculo precisa.
+DIRETORIO_EVENTOS = os.environ.get("CS2HUB_EVENTOS", os.path.join("dados", "eventos"))
+LIMITE_EVENTOS = int(os.environ.get("CS2HUB_EVENTOS_LIMITE_MB", 4096)) * 2**20
+
+# Sobe quando a forma de calcular stats_partida muda, para invalidar os stats.json salvos.
+VERSAO_STATS = 2
+
+
+def _compactar(df):
+    df = df.copy()
+    for col in df.columns:
+        if col == 'tick':
+            df[col] = df[col].astype('int32')
+        elif eh_coluna_id(col):
+            # uint64; o Parquet já guarda como dicionário (poucos ids distintos por partida)
+            df[col] = limpar_steamid(df[col])
+        elif pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif not (pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col])):
+            # times vêm misturados (str/int); str() não muda o que normalizar_time enxerga
+            df[col] = df[col].astype(str).astype('category')
+    return df
+
+
+def caminho_partida(match_hash, diretorio=DIRETORIO_EVENTOS):
+    return os.path.join(diretorio, match_hash)
+
+
+def partida_gravada(match_hash, diretorio=DIRETORIO_EVENTOS):
+    return os.path.exists(os.path.join(caminho_partida(match_hash, diretorio), "meta.json"))
+
+
+def gravar_partida(match_hash, mapa_nome, eventos, diretorio=DIRETORIO_EVENTOS):
+    destino = caminho_partida(match_hash, diretorio)
+    if partida_gravada(match_hash, diretorio): return destino
+    os.makedirs(diretorio, exist_ok=True)
+    # grava num diretório temporário ao lado e renomeia: ninguém lê uma partida pela metade
+    temp = tempfile.mkdtemp(prefix=".tmp-", dir=diretorio)
+    try:
+        for nome, df in eventos.items():
+            _compactar(df).to_parquet(os.path.join(temp, f"{nome}.parquet"), index=False)
+        with open(os.path.join(temp, "meta.json"), "w") as f:
+            json.dump({"match_hash": match_hash, "mapa": mapa_nome}, f)
+        os.replace(temp, destino)
+    except OSError:
+        shutil.rmtree(temp, ignore_errors=True)
+        if not partida_gravada(match_hash, diretorio): raise
+    return destino
+
+
+def ler_partida(match_hash, diretorio=DIRETORIO_EVENTOS):
+    pasta = caminho_partida(match_hash, diretorio)
+    with open(os.path.join(pasta, "meta.json")) as f: meta = json.load(f)
+    eventos = {}
+    for nome, colunas in EVENTOS.items():
+        arquivo = os.path.join(pasta, f"{nome}.parquet")
+        df = pd.read_parquet(arquivo) if os.path.exists(arquivo) else pd.DataFrame()
+        eventos[nome] = tipar_evento(df, colunas)
+    return meta["mapa"], eventos
+
+
+def partidas_gravadas(diretorio=DIRETORIO_EVENTOS):
+    if not os.path.isdir(diretorio): return []
+    return sorted(h for h in os.listdir(diretorio) if not h.startswith(".") and partida_gravada(h, diretorio))
+
+
+# --- LIMITE DE TAMANHO (LRU) ---
+# O mtime do meta.json marca o último uso da partida.
+def tocar(match_hash, diretorio=DIRETORIO_EVENTOS):
+    try: os.utime(os.path.join(caminho_partida(match_hash, diretorio), "meta.json"))
+    except OSError: pass
+
+
+def _tamanho(pasta):
+    with os.scandir(pasta) as itens: return sum(item.stat().st_size for item in itens if item.is_file())
+
+
+def podar(protegidas, diretorio=DIRETORIO_EVENTOS, limite=LIMITE_EVENTOS):
+    # remove as partidas usadas há mais tempo até o armazém caber no limite, pulando as protegidas
+    # (hashes da temporada atual). Devolve (quantas saíram, bytes que ainda passam do limite).
+    partidas, total = [], 0
+    for match_hash in partidas_gravadas(diretorio):
+        pasta = caminho_partida(match_hash, diretorio)
+        try: quando, tamanho = os.path.getmtime(os.path.join(pasta, "meta.json")), _tamanho(pasta)
+        except OSError: continue
+        total += tamanho
+        if match_hash not in protegidas: partidas.append((quando, tamanho, pasta))
+    removidas = 0
+    for _, tamanho, pasta in sorted(partidas):
+        if total <= limite: break
+        shutil.rmtree(pasta, ignore_errors=True)
+        total -= tamanho
+        removidas += 1
+    return removidas, max(0, total - limite)
+
+
+# --- STATS POR PARTIDA JÁ CALCULADOS (PARA O RECÁLCULO INCREMENTAL) ---
+def assinatura_stats(amigos):
+    conteudo = json.dumps({"versao": VERSAO_STATS, "amigos": amigos}, sort_keys=True)
+    return hashlib.md5(conteudo.encode()).hexdigest()
+
+
+def ler_stats(match_hash, assinatura, diretorio=DIRETORIO_EVENTOS):
+    try:
+        with open(os.path.join(caminho_partida(match_hash, diretorio), "stats.json")) as f: salvo = json.load(f)
+    except (OSError, ValueError): return None
+    return salvo if salvo.get("assinatura") == assinatura else None
+
+
+def ler_rounds(match_hash, diretorio=DIRETORIO_EVENTOS):
+    # só vale junto de um stats.json com a assinatura certa (gravado depois do rounds.parquet)
+    arquivo = os.path.join(caminho_partida(match_hash, diretorio), "rounds.parquet")
+    return pd.read_parquet(arquivo) if os.path.exists(arquivo) else None
+
+
+def gravar_stats(match_hash, assinatura, mapa_nome, stats_partida, diretorio=DIRETORIO_EVENTOS, rounds=None):
+    pasta = caminho_partida(match_hash, diretorio)
+    if rounds is not None:
+        temp_rounds = os.path.join(pasta, ".rounds.parquet.tmp")
+        rounds.to_parquet(temp_rounds, index=False)
+        os.replace(temp_rounds, os.path.join(pasta, "rounds.parquet"))
+    temp = os.path.join(pasta, ".stats.json.tmp")
+    with open(temp, "w") as f:
+        json.dump({"assinatura": assinatura, "mapa": mapa_nome, "stats": stats_partida}, f)
+    os.replace(temp, os.path.join(pasta, "stats.json"))
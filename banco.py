@@ -0,0 +1,234 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+import medicoes
+
+# --- ACESSO AO BANCO ---
+# Banco define o que o app, a ingestão e os scripts precisam de processed_matches,
+# player_stats, player_map_stats, match_results e das tabelas history_*. BancoSupabase fala com o
+# projeto Supabase; banco_sqlite.BancoSQLite é o substituto local (offline, benchmarks, LAN).
+
+# Mapeamento das chaves de stats_partida para as colunas de player_stats.
+COLUNAS_STATS = {
+    "kills": "Kills", "deaths": "Deaths", "assists": "Assists",
+    "matches": "Matches", "wins": "Wins",
+    "headshots": "Headshots", "enemies_flashed": "EnemiesFlashed",
+    "utility_damage": "UtilityDamage", "total_damage": "TotalDamage",
+    "rounds_played": "RoundsPlayed",
+}
+
+
+def linhas_partida(stats_partida):
+    return [{"nickname": nick, **{col: int(dados[chave]) for col, chave in COLUNAS_STATS.items()}}
+            for nick, dados in stats_partida.items() if dados['Matches'] > 0]
+
+
+def instante(jogada_em=None):
+    # played_at em UTC e ISO 8601, o mesmo formato nos dois backends (no SQLite a ordem do texto é a do tempo)
+    return (jogada_em or datetime.now(timezone.utc)).astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def totais_partidas(partidas):
+    # partidas: iterável de (mapa, stats_partida). Mesma soma que a rpc registrar_partida faz no banco.
+    stats, mapas = {}, {}
+    for mapa_nome, stats_partida in partidas:
+        for linha in linhas_partida(stats_partida):
+            total = stats.setdefault(linha["nickname"], {"nickname": linha["nickname"], **{c: 0 for c in COLUNAS_STATS}})
+            for col in COLUNAS_STATS: total[col] += linha[col]
+            if mapa_nome:
+                total_mapa = mapas.setdefault((linha["nickname"], mapa_nome), {"nickname": linha["nickname"], "map_name": mapa_nome, "matches": 0, "wins": 0})
+                total_mapa["matches"] += 1
+                total_mapa["wins"] += 1 if linha["wins"] > 0 else 0
+    return list(stats.values()), list(mapas.values())
+
+
+def linhas_resultados(partidas):
+    # partidas: {match_hash: (mapa, stats_partida)}. Uma linha por jogador e partida, como em match_results.
+    return [{"match_hash": match_hash, **linha} for match_hash, (_, stats_partida) in partidas.items()
+            for linha in linhas_partida(stats_partida)]
+
+
+class Banco(ABC):
+    @abstractmethod
+    def demo_ja_processada(self, file_hash):
+        raise NotImplementedError
+
+    @abstractmethod
+    def hashes_processados(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def registrar_partida(self, file_hash, stats_partida, mapa_atual, jogada_em=None):
+        # registra a demo, soma as estatísticas de jogadores e mapas e grava uma linha por jogador
+        # em match_results (jogada_em: datetime da partida; None = agora), tudo de forma atômica.
+        # Retorna False se a demo já tinha sido registrada.
+        raise NotImplementedError
+
+    def registrar_em_segundo_plano(self, file_hash, stats_partida, mapa_atual, jogada_em=None):
+        # devolve um Future com o resultado de registrar_partida; aqui a escrita já acontece na hora
+        futuro = Future()
+        try: futuro.set_result(self.registrar_partida(file_hash, stats_partida, mapa_atual, jogada_em))
+        except Exception as e: futuro.set_exception(e)
+        return futuro
+
+    def executar_juntos(self, funcoes):
+        # leituras independentes (ex.: as de uma página); banco_async.BancoSupabaseAsync faz em paralelo
+        return [funcao() for funcao in funcoes]
+
+    @abstractmethod
+    def substituir_estatisticas(self, linhas_stats, linhas_mapas, hashes_resultados=(), linhas_resultados=()):
+        # regrava player_stats e player_map_stats e, para as partidas de hashes_resultados, as linhas
+        # de match_results (mantendo played_at e mapa); tudo numa transação
+        raise NotImplementedError
+
+    @abstractmethod
+    def arquivar_e_resetar(self, nome_temporada):
+        # copia o ranking atual para o histórico e zera tudo de forma atômica; repetir é seguro
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_player_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_player_map_stats(self):
+        raise NotImplementedError
+
+    # agregados prontos para as páginas (views de sql/003_agregacoes.sql)
+    @abstractmethod
+    def ler_totais_mapas(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_jogadores_mapas(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_mapas_jogador(self, nickname):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_temporadas(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_temporada(self, nome_temporada):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_resultados(self, apos_id=0, desde=None):
+        # linhas de match_results com id > apos_id (e played_at >= desde), em ordem de id
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_ultimos_resultados(self, partidas):
+        # as últimas `partidas` linhas de match_results de cada jogador, por played_at
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_revisao_resultados(self):
+        # contador que sobe a cada linha de match_results alterada ou apagada (inserções não contam)
+        raise NotImplementedError
+
+
+LIMITE_PAGINA = 1000
+
+
+class BancoSupabase(Banco):
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def _executar(self, nome, consulta):
+        # cada chamada é uma ida ao Supabase; o tempo vai para a etapa banco:<nome>
+        with medicoes.etapa(f"banco:{nome}"): return consulta.execute()
+
+    def demo_ja_processada(self, file_hash):
+        # na dúvida segue para a análise: a rpc registrar_partida barra a duplicada no final
+        try:
+            response = self._executar('demo_ja_processada', self.cliente.table('processed_matches').select('match_hash').eq('match_hash', file_hash))
+            return len(response.data) > 0
+        except Exception:
+            medicoes.contar("falha:banco:demo_ja_processada")
+            return False
+
+    def hashes_processados(self):
+        # paginado pelo próprio hash, como ler_resultados pelo id
+        hashes, ultimo = set(), None
+        while True:
+            consulta = self.cliente.table('processed_matches').select('match_hash')
+            if ultimo is not None: consulta = consulta.gt('match_hash', ultimo)
+            pagina = self._executar('hashes_processados', consulta.order('match_hash').limit(LIMITE_PAGINA)).data or []
+            hashes.update(row['match_hash'] for row in pagina)
+            if len(pagina) < LIMITE_PAGINA: return hashes
+            ultimo = pagina[-1]['match_hash']
+
+    def registrar_partida(self, file_hash, stats_partida, mapa_atual, jogada_em=None):
+        # uma única chamada (sql/005_match_results.sql), tudo na mesma transação
+        response = self._executar('registrar_partida', self.cliente.rpc('registrar_partida', {
+            "p_match_hash": file_hash,
+            "p_mapa": mapa_atual or None,
+            "p_linhas": linhas_partida(stats_partida),
+            "p_jogada_em": instante(jogada_em),
+        }))
+        return bool(response.data)
+
+    def substituir_estatisticas(self, linhas_stats, linhas_mapas, hashes_resultados=(), linhas_resultados=()):
+        # sql/006_substituir_estatisticas.sql: apaga e regrava tudo na mesma transação
+        self._executar('substituir_estatisticas', self.cliente.rpc('substituir_estatisticas', {
+            "p_stats": linhas_stats, "p_mapas": linhas_mapas,
+            "p_hashes": list(hashes_resultados), "p_resultados": list(linhas_resultados),
+        }))
+
+    def arquivar_e_resetar(self, nome_temporada):
+        # sql/004_arquivar_temporada.sql: cópia para o histórico e limpeza na mesma transação, no servidor
+        self._executar('arquivar_temporada', self.cliente.rpc('arquivar_temporada', {"p_season_name": nome_temporada}))
+
+    def ler_player_stats(self):
+        return self._executar('ler_player_stats', self.cliente.table('player_stats').select("*")).data or []
+
+    def ler_player_map_stats(self):
+        return self._executar('ler_player_map_stats', self.cliente.table('player_map_stats').select("*")).data or []
+
+    def ler_totais_mapas(self):
+        return self._executar('ler_totais_mapas', self.cliente.table('mapas_totais').select("*")).data or []
+
+    def ler_jogadores_mapas(self):
+        response = self._executar('ler_jogadores_mapas', self.cliente.table('mapas_jogadores').select("nickname").order('nickname'))
+        return [row['nickname'] for row in response.data or []]
+
+    def ler_mapas_jogador(self, nickname):
+        return self._executar('ler_mapas_jogador', self.cliente.table('player_map_stats').select("map_name, matches, wins").eq('nickname', nickname)).data or []
+
+    def ler_temporadas(self):
+        response = self._executar('ler_temporadas', self.cliente.table('temporadas').select("season_name").order('season_name'))
+        return [row['season_name'] for row in response.data or []]
+
+    def ler_temporada(self, nome_temporada):
+        return self._executar('ler_temporada', self.cliente.table('temporada_ranking').select("*").eq('season_name', nome_temporada)).data or []
+
+    def ler_resultados(self, apos_id=0, desde=None):
+        # paginado pelo id (a API devolve no máximo LIMITE_PAGINA linhas por chamada)
+        linhas = []
+        while True:
+            consulta = self.cliente.table('match_results').select("*").gt('id', apos_id)
+            if desde is not None: consulta = consulta.gte('played_at', instante(desde))
+            pagina = self._executar('ler_resultados', consulta.order('id').limit(LIMITE_PAGINA)).data or []
+            linhas.extend(pagina)
+            if len(pagina) < LIMITE_PAGINA: return linhas
+            apos_id = pagina[-1]['id']
+
+    def ler_ultimos_resultados(self, partidas):
+        # sql/007_janelas.sql; paginado pelo id como ler_resultados
+        linhas, apos_id = [], 0
+        while True:
+            consulta = self.cliente.rpc('ultimos_resultados', {"p_partidas": partidas}).gt('id', apos_id)
+            pagina = self._executar('ler_ultimos_resultados', consulta.order('id').limit(LIMITE_PAGINA)).data or []
+            linhas.extend(pagina)
+            if len(pagina) < LIMITE_PAGINA: return linhas
+            apos_id = pagina[-1]['id']
+
+    def ler_revisao_resultados(self):
+        # sql/007_janelas.sql: linha única, sobe a cada update ou delete em match_results
+        response = self._executar('ler_revisao_resultados', self.cliente.table('match_results_revisao').select('revisao'))
+        return response.data[0]['revisao'] if response.data else 0
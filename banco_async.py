@@ -0,0 +1,63 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from supabase import AsyncClientOptions, acreate_client
+
+from banco import BancoSupabase
+import medicoes
+
+# --- SUPABASE ASSÍNCRONO (CONEXÕES REAPROVEITADAS, CONCORRÊNCIA LIMITADA) ---
+# Um event loop numa thread própria, vivo enquanto o processo existir, com um único
+# httpx.AsyncClient: as conexões HTTP ficam abertas (keep-alive) entre reruns e páginas.
+# Os métodos continuam síncronos para quem chama (mesma interface de Banco); o que muda é
+# que várias chamadas feitas de threads diferentes (executar_juntos, registrar_em_segundo_plano)
+# vão juntas para a rede, no máximo CONCORRENCIA_BANCO de cada vez.
+CONCORRENCIA_BANCO = int(os.environ.get("CS2HUB_CONCORRENCIA", 8))
+KEEPALIVE_SEGUNDOS = 60
+
+
+class LacoBanco:
+    def __init__(self):
+        self.laco = asyncio.new_event_loop()
+        threading.Thread(target=self.laco.run_forever, name="banco-async", daemon=True).start()
+
+    def agendar(self, corrotina):
+        return asyncio.run_coroutine_threadsafe(corrotina, self.laco)
+
+    def rodar(self, corrotina):
+        return self.agendar(corrotina).result()
+
+
+class BancoSupabaseAsync(BancoSupabase):
+    def __init__(self, url, key, concorrencia=CONCORRENCIA_BANCO):
+        self.concorrencia = concorrencia
+        self._laco = LacoBanco()
+        self.cliente = self._laco.rodar(self._criar_cliente(url, key))
+        # só adaptam as chamadas síncronas ao loop; quem limita a rede é o semáforo
+        self._threads = ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix="banco")
+
+    async def _criar_cliente(self, url, key):
+        self._semaforo = asyncio.Semaphore(self.concorrencia)
+        http = httpx.AsyncClient(limits=httpx.Limits(max_connections=self.concorrencia, max_keepalive_connections=self.concorrencia,
+                                                     keepalive_expiry=KEEPALIVE_SEGUNDOS), timeout=120)
+        return await acreate_client(url, key, AsyncClientOptions(httpx_client=http, auto_refresh_token=False))
+
+    async def _limitado(self, consulta):
+        async with self._semaforo: return await consulta.execute()
+
+    def _executar(self, nome, consulta):
+        with medicoes.etapa(f"banco:{nome}"): return self._laco.rodar(self._limitado(consulta))
+
+    def _enviar(self, funcao, *args):
+        # a thread roda no contexto de quem chamou: as medições caem na coleta certa
+        return self._threads.submit(contextvars.copy_context().run, funcao, *args)
+
+    def executar_juntos(self, funcoes):
+        return [futuro.result() for futuro in [self._enviar(funcao) for funcao in funcoes]]
+
+    def registrar_em_segundo_plano(self, file_hash, stats_partida, mapa_atual, jogada_em=None):
+        return self._enviar(self.registrar_partida, file_hash, stats_partida, mapa_atual, jogada_em)
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+
+from banco import COLUNAS_STATS, Banco, instante, linhas_partida
+import medicoes
+
+# --- BANCO LOCAL (SQLITE) ---
+# Mesmas tabelas e mesma semântica do Supabase (incluindo a atomicidade da
+# registrar_partida), num arquivo local. Serve para rodar o app sem internet numa
+# LAN e para medir a ingestão sem a latência de rede no meio.
+ESQUEMA = """
+create table if not exists processed_matches (
+    match_hash text primary key,
+    created_at text default current_timestamp
+);
+create table if not exists player_stats (
+    id integer primary key,
+    nickname text not null unique,
+    kills integer default 0, deaths integer default 0, assists integer default 0,
+    matches integer default 0, wins integer default 0, headshots integer default 0,
+    enemies_flashed integer default 0, utility_damage integer default 0,
+    total_damage integer default 0, rounds_played integer default 0,
+    created_at text default current_timestamp
+);
+create table if not exists player_map_stats (
+    id integer primary key,
+    nickname text not null,
+    map_name text not null,
+    matches integer default 0, wins integer default 0,
+    unique (nickname, map_name)
+);
+create table if not exists history_player_stats (
+    id integer primary key,
+    season_name text not null,
+    nickname text not null,
+    kills integer default 0, deaths integer default 0, assists integer default 0,
+    matches integer default 0, wins integer default 0, headshots integer default 0,
+    enemies_flashed integer default 0, utility_damage integer default 0,
+    total_damage integer default 0, rounds_played integer default 0
+);
+create index if not exists history_player_stats_season_idx on history_player_stats (season_name);
+create table if not exists history_map_stats (
+    id integer primary key,
+    season_name text not null,
+    nickname text not null,
+    map_name text not null,
+    matches integer default 0, wins integer default 0
+);
+create index if not exists history_map_stats_season_idx on history_map_stats (season_name);
+create index if not exists player_map_stats_map_name_idx on player_map_stats (map_name);
+create table if not exists match_results (
+    id integer primary key,
+    match_hash text not null,
+    nickname text not null,
+    map_name text,
+    played_at text not null,
+    kills integer default 0, deaths integer default 0, assists integer default 0,
+    matches integer default 0, wins integer default 0, headshots integer default 0,
+    enemies_flashed integer default 0, utility_damage integer default 0,
+    total_damage integer default 0, rounds_played integer default 0,
+    unique (match_hash, nickname)
+);
+create index if not exists match_results_played_at_idx on match_results (played_at);
+create index if not exists match_results_nickname_played_at_idx on match_results (nickname, played_at);
+create table if not exists match_results_revisao (
+    id integer primary key check (id = 1),
+    revisao integer not null default 0
+);
+insert or ignore into match_results_revisao (id) values (1);
+create trigger if not exists match_results_alterada after update on match_results
+begin update match_results_revisao set revisao = revisao + 1 where id = 1; end;
+create trigger if not exists match_results_apagada after delete on match_results
+begin update match_results_revisao set revisao = revisao + 1 where id = 1; end;
+create view if not exists mapas_totais as
+select map_name, max(matches) as matches, sum(wins) as wins_total, sum(matches) as matches_total
+from player_map_stats group by map_name;
+create view if not exists mapas_jogadores as select distinct nickname from player_map_stats;
+create view if not exists temporadas as select distinct season_name from history_player_stats;
+create view if not exists temporada_ranking as
+select season_name, nickname,
+       sum(kills) as kills, sum(deaths) as deaths, sum(assists) as assists,
+       sum(matches) as matches, sum(wins) as wins, sum(headshots) as headshots,
+       sum(enemies_flashed) as enemies_flashed, sum(utility_damage) as utility_damage,
+       sum(total_damage) as total_damage, sum(rounds_played) as rounds_played
+from history_player_stats group by season_name, nickname;
+"""
+
+COLS = list(COLUNAS_STATS)
+
+
+class BancoSQLite(Banco):
+    def __init__(self, caminho=os.path.join("dados", "cs2hub.db")):
+        if caminho != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        # o Streamlit atende cada sessão em uma thread; uma conexão compartilhada com lock basta
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.execute("pragma journal_mode=wal")
+        self.conexao.executescript(ESQUEMA)
+        self._lock = threading.Lock()
+
+    def _consultar(self, nome, sql, parametros=()):
+        with self._lock, medicoes.etapa(f"banco:{nome}"):
+            return [dict(row) for row in self.conexao.execute(sql, parametros).fetchall()]
+
+    def _transacao(self, nome, funcao):
+        with self._lock, medicoes.etapa(f"banco:{nome}"):
+            self.conexao.execute("begin immediate")
+            try:
+                resultado = funcao(self.conexao)
+            except BaseException:
+                self.conexao.execute("rollback")
+                raise
+            self.conexao.execute("commit")
+            return resultado
+
+    def demo_ja_processada(self, file_hash):
+        return bool(self._consultar("demo_ja_processada", "select 1 from processed_matches where match_hash = ?", (file_hash,)))
+
+    def hashes_processados(self):
+        return {row['match_hash'] for row in self._consultar("hashes_processados", "select match_hash from processed_matches")}
+
+    def registrar_partida(self, file_hash, stats_partida, mapa_atual, jogada_em=None):
+        linhas = linhas_partida(stats_partida)
+        quando = instante(jogada_em)
+
+        def registrar(con):
+            if con.execute("insert or ignore into processed_matches (match_hash) values (?)", (file_hash,)).rowcount == 0:
+                return False
+            con.executemany(
+                f"insert into player_stats (nickname, {', '.join(COLS)}) values (?{', ?' * len(COLS)}) "
+                f"on conflict (nickname) do update set {', '.join(f'{c} = {c} + excluded.{c}' for c in COLS)}",
+                [(l["nickname"], *(l[c] for c in COLS)) for l in linhas])
+            if mapa_atual:
+                con.executemany(
+                    "insert into player_map_stats (nickname, map_name, matches, wins) values (?, ?, 1, ?) "
+                    "on conflict (nickname, map_name) do update set matches = matches + 1, wins = wins + excluded.wins",
+                    [(l["nickname"], mapa_atual, 1 if l["wins"] > 0 else 0) for l in linhas])
+            con.executemany(
+                f"insert or ignore into match_results (match_hash, nickname, map_name, played_at, {', '.join(COLS)}) "
+                f"values (?, ?, ?, ?{', ?' * len(COLS)})",
+                [(file_hash, l["nickname"], mapa_atual or None, quando, *(l[c] for c in COLS)) for l in linhas])
+            return True
+        return self._transacao("registrar_partida", registrar)
+
+    def substituir_estatisticas(self, linhas_stats, linhas_mapas, hashes_resultados=(), linhas_resultados=()):
+        def substituir(con):
+            con.execute("delete from player_stats")
+            con.execute("delete from player_map_stats")
+            con.executemany(f"insert into player_stats (nickname, {', '.join(COLS)}) values (?{', ?' * len(COLS)})",
+                            [(l["nickname"], *(l[c] for c in COLS)) for l in linhas_stats])
+            con.executemany("insert into player_map_stats (nickname, map_name, matches, wins) values (?, ?, ?, ?)",
+                            [(l["nickname"], l["map_name"], l["matches"], l["wins"]) for l in linhas_mapas])
+            # recalculadas: a data e o mapa vêm das linhas atuais da partida
+            datas = {}
+            for match_hash in hashes_resultados:
+                row = con.execute("select min(map_name), min(played_at) from match_results where match_hash = ?", (match_hash,)).fetchone()
+                if row[1] is not None: datas[match_hash] = (row[0], row[1])
+            con.executemany("delete from match_results where match_hash = ?", [(h,) for h in datas])
+            con.executemany(
+                f"insert into match_results (match_hash, nickname, map_name, played_at, {', '.join(COLS)}) "
+                f"values (?, ?, ?, ?{', ?' * len(COLS)})",
+                [(l["match_hash"], l["nickname"], *datas[l["match_hash"]], *(l[c] for c in COLS))
+                 for l in linhas_resultados if l["match_hash"] in datas])
+        self._transacao("substituir_estatisticas", substituir)
+
+    def arquivar_e_resetar(self, nome_temporada):
+        def arquivar(con):
+            con.execute(f"insert into history_player_stats (season_name, nickname, {', '.join(COLS)}) "
+                        f"select ?, nickname, {', '.join(COLS)} from player_stats", (nome_temporada,))
+            con.execute("insert into history_map_stats (season_name, nickname, map_name, matches, wins) "
+                        "select ?, nickname, map_name, matches, wins from player_map_stats", (nome_temporada,))
+            con.execute("delete from player_stats")
+            con.execute("delete from player_map_stats")
+            con.execute("delete from processed_matches")
+        self._transacao("arquivar_e_resetar", arquivar)
+
+    def ler_player_stats(self):
+        return self._consultar("ler_player_stats", "select * from player_stats")
+
+    def ler_player_map_stats(self):
+        return self._consultar("ler_player_map_stats", "select * from player_map_stats")
+
+    def ler_totais_mapas(self):
+        return self._consultar("ler_totais_mapas", "select * from mapas_totais")
+
+    def ler_jogadores_mapas(self):
+        return [row['nickname'] for row in self._consultar("ler_jogadores_mapas", "select nickname from mapas_jogadores order by nickname")]
+
+    def ler_mapas_jogador(self, nickname):
+        return self._consultar("ler_mapas_jogador", "select map_name, matches, wins from player_map_stats where nickname = ?", (nickname,))
+
+    def ler_temporadas(self):
+        return [row['season_name'] for row in self._consultar("ler_temporadas", "select season_name from temporadas order by season_name")]
+
+    def ler_temporada(self, nome_temporada):
+        return self._consultar("ler_temporada", "select * from temporada_ranking where season_name = ?", (nome_temporada,))
+
+    def ler_resultados(self, apos_id=0, desde=None):
+        if desde is None:
+            return self._consultar("ler_resultados", "select * from match_results where id > ? order by id", (apos_id,))
+        # sem analyze o planejador prefere varrer pelo id; o período é que restringe as linhas
+        return self._consultar("ler_resultados", "select * from match_results indexed by match_results_played_at_idx "
+                               "where played_at >= ? and id > ? order by id", (instante(desde), apos_id))
+
+    def ler_ultimos_resultados(self, partidas):
+        # uma consulta por jogador, cada uma pelo índice (nickname, played_at)
+        with self._lock, medicoes.etapa("banco:ler_ultimos_resultados"):
+            nicknames = [row[0] for row in self.conexao.execute("select distinct nickname from match_results")]
+            return [dict(row) for nickname in nicknames for row in self.conexao.execute(
+                "select * from match_results where nickname = ? order by played_at desc limit ?", (nickname, partidas))]
+
+    def ler_revisao_resultados(self):
+        return self._consultar("ler_revisao_resultados", "select revisao from match_results_revisao")[0]["revisao"]
@@ -0,0 +1,58 @@
+# Compara a extração antiga (um parse_events por evento) com a passada única.
+# Uso: python -m benchmarks.extracao caminho/da/demo.dem [--repeticoes 3]
+import argparse
+import time
+
+import pandas as pd
+from demoparser2 import DemoParser
+
+from extracao import EVENTOS, extrair_eventos, tipar_evento
+
+
+def extrair_por_evento(parser):
+    tempos = {}
+    frames = {}
+    for nome, colunas in EVENTOS.items():
+        inicio = time.perf_counter()
+        try:
+            dados = parser.parse_events([nome])
+            df = pd.DataFrame(dados[0][1]) if isinstance(dados, list) and dados else pd.DataFrame()
+        except Exception: df = pd.DataFrame()
+        frames[nome] = tipar_evento(df, colunas)
+        tempos[nome] = time.perf_counter() - inicio
+    return frames, tempos
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("demo")
+    ap.add_argument("--repeticoes", type=int, default=3)
+    args = ap.parse_args()
+
+    melhor_antigo, melhor_novo, etapas = float("inf"), float("inf"), {}
+    for _ in range(args.repeticoes):
+        parser = DemoParser(args.demo)
+        inicio = time.perf_counter()
+        frames_antigos, tempos = extrair_por_evento(parser)
+        total = time.perf_counter() - inicio
+        if total < melhor_antigo: melhor_antigo, etapas = total, tempos
+
+        parser = DemoParser(args.demo)
+        inicio = time.perf_counter()
+        frames_novos = extrair_eventos(parser)
+        melhor_novo = min(melhor_novo, time.perf_counter() - inicio)
+
+    print(f"{'etapa':<16}{'tempo (s)':>12}{'linhas':>10}")
+    for nome, t in etapas.items():
+        print(f"{nome:<16}{t:>12.3f}{len(frames_antigos[nome]):>10}")
+    print(f"{'6 passadas':<16}{melhor_antigo:>12.3f}")
+    print(f"{'passada única':<16}{melhor_novo:>12.3f}")
+    print(f"ganho: {melhor_antigo / melhor_novo:.1f}x")
+
+    for nome in EVENTOS:
+        if not frames_antigos[nome].equals(frames_novos[nome]):
+            print(f"⚠️ {nome}: frames diferentes entre os dois caminhos")
+
+
+if __name__ == "__main__":
+    main()
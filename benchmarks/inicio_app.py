@@ -0,0 +1,76 @@
+# Partida a frio e reruns do app por página, com o streamlit.testing (sem navegador).
+# Cada página roda num subprocesso novo: a primeira execução (página inicial) inclui os
+# imports do app, depois vem a navegação até a página e os reruns nela. Usa um SQLite
+# temporário como banco.
+# Uso: python -m benchmarks.inicio_app [--reruns 10] [--saida inicio.json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGINAS = ["📤 Upload & Partida", "🏆 Ranking Global", "🗺️ Estatísticas de Mapas", "📜 Histórico"]
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def medir_pagina(pagina, reruns):
+    inicio = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_streamlit = time.perf_counter() - inicio
+    # o próprio streamlit já carrega parte do plotly; conta só o que o app trouxe a mais
+    ja_carregados = set(sys.modules)
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    # primeira execução (página inicial) inclui os imports do app; depois navega para a página
+    inicio = time.perf_counter()
+    at.run()
+    frio = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    if pagina != PAGINAS[0]: at.sidebar.radio[0].set_value(pagina).run()
+    navegar = time.perf_counter() - inicio
+    novos = {m.split(".")[0] for m in set(sys.modules) - ja_carregados}
+    modulos = sorted(novos & {"plotly", "altair", "demoparser2", "supabase", "pyarrow"})
+
+    tempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    erros = [str(e.value) for e in at.exception]
+    return {"pagina": pagina, "import_streamlit_s": import_streamlit, "frio_s": frio, "navegar_s": navegar,
+            "rerun_mediana_s": tempos[len(tempos) // 2], "rerun_min_s": tempos[0],
+            "modulos_carregados": modulos, "erros": erros}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=10)
+    ap.add_argument("--saida")
+    ap.add_argument("--pagina", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.pagina:
+        print(json.dumps(medir_pagina(args.pagina, args.reruns)))
+        return
+
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="cs2hub_inicio_") as pasta:
+        env = {**os.environ, "CS2HUB_BANCO": "sqlite", "CS2HUB_SQLITE": os.path.join(pasta, "inicio.db")}
+        for pagina in PAGINAS:
+            saida = subprocess.run([sys.executable, "-m", "benchmarks.inicio_app", "--pagina", pagina, "--reruns", str(args.reruns)],
+                                   capture_output=True, text=True, env=env, check=True).stdout
+            resultados.append(json.loads(saida.strip().splitlines()[-1]))
+
+    print(f"{'página':<28}{'frio (s)':>10}{'navegar (ms)':>14}{'rerun (ms)':>12}{'mín (ms)':>10}  módulos pesados")
+    for r in resultados:
+        print(f"{r['pagina']:<28}{r['frio_s']:>10.3f}{r['navegar_s'] * 1000:>14.1f}{r['rerun_mediana_s'] * 1000:>12.1f}{r['rerun_min_s'] * 1000:>10.1f}  {', '.join(r['modulos_carregados']) or '-'}"
+              + (f"  ⚠️ {r['erros']}" if r["erros"] else ""))
+    if args.saida:
+        with open(args.saida, "w") as f: json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Latência do acesso ao Supabase: cliente síncrono (uma requisição por vez) contra o
+# banco_async (conexões reaproveitadas e chamadas independentes em paralelo). Roda contra
+# um servidor local que imita as rotas do PostgREST usadas pelo app e atrasa cada resposta,
+# como a ida e volta até o Supabase. Conta também quantas conexões TCP cada lado abriu.
+# Uso: python -m benchmarks.latencia_banco [--atraso 80] [--partidas 20] [--repeticoes 5] [--saida latencia.json]
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from supabase import create_client
+
+from banco import BancoSupabase, COLUNAS_STATS
+from banco_async import BancoSupabaseAsync
+from benchmarks import sinteticos
+
+JOGADORES = list(sinteticos.elenco(10))
+RESPOSTAS = {
+    "temporadas": [{"season_name": f"Temporada {n}"} for n in range(1, 6)],
+    "temporada_ranking": [{"season_name": "Temporada 1", "nickname": nick, **{c: 10 for c in COLUNAS_STATS}} for nick in JOGADORES],
+    "mapas_jogadores": [{"nickname": nick} for nick in JOGADORES],
+    "mapas_totais": [{"map_name": mapa, "matches": 10, "wins_total": 40, "matches_total": 80} for mapa in sinteticos.MAPAS],
+    "player_map_stats": [{"map_name": mapa, "matches": 10, "wins": 5} for mapa in sinteticos.MAPAS],
+    "player_stats": [{"nickname": nick, **{c: 10 for c in COLUNAS_STATS}} for nick in JOGADORES],
+}
+
+
+class ServidorFalso(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, atraso):
+        super().__init__(("127.0.0.1", 0), RotasFalsas)
+        self.atraso = atraso
+        self.conexoes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class RotasFalsas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # cabeçalho e corpo saem em escritas separadas; sem isso o Nagle soma ~40 ms a cada resposta
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server._lock: self.server.conexoes += 1
+
+    def _responder(self, corpo):
+        time.sleep(self.server.atraso)
+        dados = json.dumps(corpo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        self._responder(RESPOSTAS.get(urlparse(self.path).path.rsplit("/", 1)[-1], []))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._responder(True)
+
+    def log_message(self, *args):
+        pass
+
+
+def cenarios(bd, partidas):
+    stats = {nick: {chave: 1 for chave in COLUNAS_STATS.values()} for nick in JOGADORES}
+    contador = iter(range(10**9))
+    return {
+        "historico (temporadas + ranking)": lambda: bd.executar_juntos([bd.ler_temporadas, lambda: bd.ler_temporada("Temporada 1")]),
+        "mapas (jogadores + totais)": lambda: bd.executar_juntos([bd.ler_jogadores_mapas, bd.ler_totais_mapas]),
+        f"ingestao ({partidas} partidas)": lambda: [futuro.result() for futuro in
+                                                    [bd.registrar_em_segundo_plano(f"h{next(contador)}", stats, "Mirage") for _ in range(partidas)]],
+    }
+
+
+def medir(bd, args):
+    resultado = {}
+    for nome, funcao in cenarios(bd, args.partidas).items():
+        funcao()
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        resultado[nome] = statistics.median(tempos)
+    return resultado
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--atraso", type=float, default=80, help="atraso de cada resposta, em ms")
+    ap.add_argument("--partidas", type=int, default=20)
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--saida")
+    args = ap.parse_args()
+
+    servidor = ServidorFalso(args.atraso / 1000)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        resultados = {}
+        for nome, criar in [("sincrono", lambda: BancoSupabase(create_client(servidor.url, "chave-local"))),
+                            ("async", lambda: BancoSupabaseAsync(servidor.url, "chave-local"))]:
+            antes = servidor.conexoes
+            tempos = medir(criar(), args)
+            resultados[nome] = {"tempos": tempos, "conexoes": servidor.conexoes - antes}
+    finally:
+        servidor.shutdown()
+
+    print(f"atraso por resposta: {args.atraso:.0f} ms")
+    print(f"{'cenário':<36}{'síncrono (ms)':>15}{'async (ms)':>12}{'ganho':>8}")
+    for nome, sincrono in resultados["sincrono"]["tempos"].items():
+        assincrono = resultados["async"]["tempos"][nome]
+        print(f"{nome:<36}{sincrono * 1000:>15.1f}{assincrono * 1000:>12.1f}{sincrono / assincrono:>7.1f}x")
+    print(f"{'conexões TCP abertas':<36}{resultados['sincrono']['conexoes']:>15}{resultados['async']['conexoes']:>12}")
+    if args.saida:
+        with open(args.saida, "w") as f: json.dump({"atraso_ms": args.atraso, **resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
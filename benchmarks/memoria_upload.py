@@ -0,0 +1,87 @@
+# Pico de memória e tempo de hash + arquivo temporário: caminho antigo (read() inteiro,
+# md5 e cópia) vs streaming em blocos.
+# Uso: python -m benchmarks.memoria_upload [--mb 300] [--demo caminho.dem]
+# Cenários: "upload" (BytesIO, como o UploadedFile do Streamlit) e "disco" (arquivo aberto,
+# como na ingestão por linha de comando). Cada medição roda em um subprocesso próprio
+# para o ru_maxrss não se misturar.
+import argparse
+import hashlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ingestao import salvar_upload
+
+
+def preparar_origem(args):
+    caminho = args.demo
+    if not caminho:
+        caminho = os.path.join(tempfile.gettempdir(), f"bench_upload_{args.mb}mb.dem")
+        if not os.path.exists(caminho) or os.path.getsize(caminho) != args.mb * 2**20:
+            with open(caminho, "wb") as f:
+                for _ in range(args.mb): f.write(os.urandom(2**20))
+    return caminho
+
+
+def abrir(cenario, caminho):
+    # no cenário upload o BytesIO já existe antes da medição, igual ao Streamlit
+    if cenario == "upload":
+        with open(caminho, "rb") as f: return io.BytesIO(f.read())
+    return open(caminho, "rb")
+
+
+def caminho_antigo(arquivo_upload):
+    arquivo_bytes = arquivo_upload.read()
+    file_hash = hashlib.md5(arquivo_bytes).hexdigest()
+    tfile = tempfile.NamedTemporaryFile(delete=False, suffix=".dem")
+    tfile.write(arquivo_bytes)
+    tfile.close()
+    return tfile.name, file_hash
+
+
+def medir(cenario, modo, caminho):
+    origem = abrir(cenario, caminho)
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    temp, file_hash = (caminho_antigo if modo == "antigo" else salvar_upload)(origem)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(temp)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"cenario": cenario, "modo": modo, "md5": file_hash, "tempo_s": round(tempo, 3),
+                      "pico_python_mb": round(pico / 2**20, 1), "rss_extra_mb": round((rss - rss_base) / 1024, 1)}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=int, default=300)
+    ap.add_argument("--demo")
+    ap.add_argument("--medir", nargs=3, metavar=("CENARIO", "MODO", "CAMINHO"))
+    args = ap.parse_args()
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    caminho = preparar_origem(args)
+    resultados = []
+    for cenario in ("upload", "disco"):
+        for modo in ("antigo", "novo"):
+            cmd = [sys.executable, "-m", "benchmarks.memoria_upload", "--medir", cenario, modo, caminho]
+            resultados.append(json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout))
+    print(f"{os.path.getsize(caminho) / 2**20:.0f} MB • {caminho}")
+    print(f"{'cenário':<9}{'modo':<8}{'tempo (s)':>11}{'pico py (MB)':>14}{'RSS extra (MB)':>16}")
+    for r in resultados:
+        print(f"{r['cenario']:<9}{r['modo']:<8}{r['tempo_s']:>11}{r['pico_python_mb']:>14}{r['rss_extra_mb']:>16}")
+    if len({r["md5"] for r in resultados}) != 1: print("⚠️ hashes diferentes entre os caminhos")
+
+
+if __name__ == "__main__":
+    main()
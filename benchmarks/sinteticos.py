@@ -0,0 +1,70 @@
+# Partidas sintéticas no formato que o demoparser2 devolve (steamids em texto, times
+# misturados entre int e "CT"/"T", colunas None), para medir sem precisar de .dem.
+import numpy as np
+import pandas as pd
+
+STEAMID_BASE = 76561198000000000
+MAPAS = ['Inferno', 'Overpass', 'Ancient', 'Nuke', 'Dust2', 'Anubis', 'Mirage']
+ARMAS = ['ak47', 'm4a1', 'awp', 'deagle', 'hegrenade', 'molotov', 'inferno', 'incgrenade']
+
+
+def elenco(n_jogadores):
+    # metade dos jogadores com duas contas, como acontece no AMIGOS de verdade
+    return {f"Jogador {i:03d}": [str(STEAMID_BASE + 2 * i)] + ([str(STEAMID_BASE + 2 * i + 1)] if i % 2 else [])
+            for i in range(n_jogadores)}
+
+
+def partida(amigos, rounds=30, hurt=None, seed=0):
+    rng = np.random.default_rng(seed)
+    hurt = rounds * 150 if hurt is None else hurt
+    ids = np.array([ids[0] for ids in amigos.values()], dtype=object)
+    n = len(ids)
+    # cada jogador num time; troca de lado no meio da partida
+    time_inicial = np.where(np.arange(n) % 2 == 0, 2, 3)
+    duracao_round = 6400
+    fim_rounds = (np.arange(1, rounds + 1) * duracao_round).astype(np.int64)
+    troca = fim_rounds[rounds // 2 - 1] + 1 if rounds > 1 else fim_rounds[-1] + 1
+
+    def ids_aleatorios(k, nulos=0.0):
+        v = ids[rng.integers(0, n, k)]
+        v[rng.random(k) < nulos] = None
+        return v
+
+    def ticks(k):
+        return np.sort(rng.integers(0, fim_rounds[-1], k))
+
+    df_round = pd.DataFrame({'tick': fim_rounds, 'winner': rng.choice(np.array(['CT', 'T', 3, 2], dtype=object), rounds)})
+
+    n_mortes = rounds * min(n, 10) // 2
+    df_death = pd.DataFrame({
+        'tick': ticks(n_mortes),
+        'attacker_steamid': ids_aleatorios(n_mortes, .03), 'attacker_xuid': None,
+        'user_steamid': ids_aleatorios(n_mortes), 'user_xuid': None,
+        'assister_steamid': ids_aleatorios(n_mortes, .6), 'assister_xuid': None,
+        'headshot': rng.random(n_mortes) < .45,
+        'attacker_team_num': rng.choice([2, 3], n_mortes), 'team_num': rng.choice([2, 3], n_mortes),
+    })
+    n_blind = rounds * 4
+    df_blind = pd.DataFrame({'tick': ticks(n_blind), 'attacker_steamid': ids_aleatorios(n_blind), 'attacker_xuid': None})
+    df_hurt = pd.DataFrame({'tick': ticks(hurt), 'attacker_steamid': ids_aleatorios(hurt, .05), 'attacker_xuid': None,
+                            'dmg_health': rng.integers(1, 100, hurt), 'weapon': rng.choice(ARMAS, hurt)})
+
+    outro = 5 - time_inicial
+    df_team = pd.DataFrame({
+        'tick': np.concatenate([np.full(n, 16), np.full(n, troca)]),
+        'user_steamid': np.concatenate([ids, ids]), 'steamid': None,
+        'team': np.concatenate([time_inicial, outro]).astype(object),
+        'oldteam': np.concatenate([np.zeros(n, dtype=int), time_inicial]),
+    })
+    n_item = rounds * n * 2
+    quem = rng.integers(0, n, n_item)
+    tick_item = ticks(n_item)
+    df_item = pd.DataFrame({'tick': tick_item, 'user_steamid': ids[quem], 'steamid': None,
+                            'team_num': np.where(tick_item < troca, time_inicial[quem], outro[quem])})
+
+    return {'round_end': df_round, 'player_death': df_death, 'player_blind': df_blind,
+            'player_hurt': df_hurt, 'player_team': df_team, 'item_pickup': df_item}
+
+
+def mapa_aleatorio(seed=0):
+    return MAPAS[seed % len(MAPAS)]
@@ -0,0 +1,203 @@
+# Suíte ponta a ponta: tempo de cada etapa da ingestão (hash, header e eventos do .dem,
+# tipagem, linha do tempo, agregação, armazém Parquet, gravação no banco) e das
+# preparações de dados das páginas (Ranking, Mapas, Histórico), em partidas sintéticas.
+# Roda offline: o banco é um BancoSQLite temporário.
+#
+# Uso:
+#   python -m benchmarks.suite [--jogadores 10 50 100] [--rounds 30 60] [--repeticoes 5]
+#                              [--partidas 20] [--mb 64] [--demo caminho.dem] [--saida resultado.json]
+#   python -m benchmarks.suite --comparar antes.json depois.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from banco_sqlite import BancoSQLite
+from estatisticas import agregar_eventos, calcular_stats, indice_steamids, linha_do_tempo, rounds_validos, stats_zeradas, time_por_round
+from extracao import EVENTOS, tipar_evento
+from ingestao import hash_demo
+from paginas import MAPAS_OFICIAIS, mapas_do_grupo, preparar_historico, preparar_mapas, preparar_ranking
+from janelas import AcumuladoResultados
+from por_round import tabela_rounds
+import armazem_eventos
+
+from benchmarks import sinteticos
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"mediana": statistics.median(tempos), "minimo": min(tempos), "maximo": max(tempos), "repeticoes": repeticoes}
+
+
+def etapas_demo(caminho, repeticoes):
+    from demoparser2 import DemoParser
+    from extracao import extrair_eventos, ler_mapa
+
+    etapas = {"header": medir(lambda: ler_mapa(DemoParser(caminho)), repeticoes)}
+    for nome in EVENTOS:
+        etapas[f"evento:{nome}"] = medir(lambda: DemoParser(caminho).parse_events([nome]), repeticoes)
+    etapas["eventos:passada_unica"] = medir(lambda: extrair_eventos(DemoParser(caminho)), repeticoes)
+    return etapas
+
+
+def etapa_hash(mb, repeticoes):
+    with tempfile.NamedTemporaryFile(suffix=".dem", delete=False) as f:
+        for _ in range(mb): f.write(os.urandom(2**20))
+    try:
+        return medir(lambda: hash_demo(f.name), repeticoes)
+    finally:
+        os.remove(f.name)
+
+
+def cenario(n_jogadores, rounds, args, pasta):
+    amigos = sinteticos.elenco(n_jogadores)
+    brutos = sinteticos.partida(amigos, rounds, seed=n_jogadores * 1000 + rounds)
+    eventos = {nome: tipar_evento(brutos[nome], colunas) for nome, colunas in EVENTOS.items()}
+    indice = indice_steamids(amigos)
+    timeline = linha_do_tempo(eventos, indice)
+    rounds_df = rounds_validos(eventos["round_end"])
+    r = args.repeticoes
+
+    etapas = {}
+    for nome, colunas in EVENTOS.items():
+        etapas[f"tipagem:{nome}"] = medir(lambda: tipar_evento(brutos[nome], colunas), r)
+    etapas["linha_do_tempo"] = medir(lambda: linha_do_tempo(eventos, indice), r)
+    etapas["time_por_round"] = medir(lambda: time_por_round(timeline, rounds_df, len(amigos)), r)
+    etapas["agregacao"] = medir(lambda: agregar_eventos(stats_zeradas(amigos), eventos, indice), r)
+    etapas["calcular_stats"] = medir(lambda: calcular_stats(eventos, amigos), r)
+    etapas["rounds"] = medir(lambda: tabela_rounds(eventos, amigos), r)
+
+    dir_eventos = os.path.join(pasta, f"eventos_{n_jogadores}_{rounds}")
+    contador = iter(range(10**9))
+    etapas["armazem:gravar"] = medir(lambda: armazem_eventos.gravar_partida(f"g{next(contador)}", "Mirage", eventos, dir_eventos), r)
+    etapas["armazem:ler"] = medir(lambda: armazem_eventos.ler_partida("g0", dir_eventos), r)
+
+    # banco: várias partidas registradas, depois as leituras e preparações das páginas
+    bd = BancoSQLite(os.path.join(pasta, f"bench_{n_jogadores}_{rounds}.db"))
+    partidas = []
+    for k in range(args.partidas):
+        stats = calcular_stats({nome: tipar_evento(df, EVENTOS[nome]) for nome, df in sinteticos.partida(amigos, rounds, seed=k).items()}, amigos)
+        if stats: partidas.append((f"p{k}", stats, sinteticos.mapa_aleatorio(k)))
+    tempos = []
+    for file_hash, stats, mapa_nome in partidas:
+        inicio = time.perf_counter()
+        bd.registrar_partida(file_hash, stats, mapa_nome)
+        tempos.append(time.perf_counter() - inicio)
+    etapas["banco:registrar_partida"] = {"mediana": statistics.median(tempos), "minimo": min(tempos), "maximo": max(tempos), "repeticoes": len(tempos)}
+    etapas["banco:hashes_processados"] = medir(bd.hashes_processados, r)
+    etapas["banco:ler_player_stats"] = medir(bd.ler_player_stats, r)
+    etapas["banco:ler_resultados"] = medir(bd.ler_resultados, r)
+    acumulado = AcumuladoResultados()
+    etapas["janelas:carga_inicial"] = medir(lambda: AcumuladoResultados().atualizar(bd), r)
+    acumulado.atualizar(bd)
+    etapas["janelas:30_dias"] = medir(lambda: acumulado.totais(dias=30), r)
+    etapas["janelas:20_partidas"] = medir(lambda: acumulado.totais(partidas=20), r)
+    primeiro = next(iter(amigos))
+    etapas["banco:ler_jogadores_mapas"] = medir(bd.ler_jogadores_mapas, r)
+    etapas["banco:ler_totais_mapas"] = medir(bd.ler_totais_mapas, r)
+    etapas["banco:ler_mapas_jogador"] = medir(lambda: bd.ler_mapas_jogador(primeiro), r)
+
+    dados_stats, totais_mapas, mapas_jogador = bd.ler_player_stats(), bd.ler_totais_mapas(), bd.ler_mapas_jogador(primeiro)
+    etapas["pagina:ranking"] = medir(lambda: preparar_ranking(dados_stats, amigos.keys()), r)
+    etapas["pagina:mapas_geral"] = medir(lambda: preparar_mapas(mapas_do_grupo(totais_mapas), MAPAS_OFICIAIS), r)
+    etapas["pagina:mapas_jogador"] = medir(lambda: preparar_mapas(mapas_jogador, MAPAS_OFICIAIS), r)
+
+    bd.arquivar_e_resetar("Bench")
+    etapas["banco:ler_temporadas"] = medir(bd.ler_temporadas, r)
+    etapas["banco:ler_temporada"] = medir(lambda: bd.ler_temporada("Bench"), r)
+    dados_temporada = bd.ler_temporada("Bench")
+    etapas["pagina:historico"] = medir(lambda: preparar_historico(dados_temporada), r)
+    bd.conexao.close()
+
+    return {"jogadores": n_jogadores, "rounds": rounds, "linhas": {nome: len(df) for nome, df in eventos.items()},
+            "partidas_no_banco": len(partidas), "etapas": etapas}
+
+
+def rodar(args):
+    resultado = {
+        "meta": {
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0], "pandas": pd.__version__, "numpy": np.__version__,
+            "plataforma": platform.platform(), "cpus": os.cpu_count(),
+            "repeticoes": args.repeticoes, "partidas": args.partidas,
+        },
+        "global": {"hash:%dmb" % args.mb: etapa_hash(args.mb, args.repeticoes)},
+        "cenarios": [],
+    }
+    if args.demo:
+        resultado["meta"]["demo"] = os.path.basename(args.demo)
+        resultado["global"]["hash:demo"] = medir(lambda: hash_demo(args.demo), args.repeticoes)
+        resultado["global"].update(etapas_demo(args.demo, args.repeticoes))
+
+    with tempfile.TemporaryDirectory(prefix="cs2hub_bench_") as pasta:
+        for n in args.jogadores:
+            for rounds in args.rounds:
+                print(f"cenário: {n} jogadores, {rounds} rounds...", file=sys.stderr)
+                resultado["cenarios"].append(cenario(n, rounds, args, pasta))
+    return resultado
+
+
+def imprimir(resultado):
+    for nome, t in resultado["global"].items():
+        print(f"{nome:<32}{t['mediana'] * 1000:>12.2f} ms")
+    for c in resultado["cenarios"]:
+        print(f"\n{c['jogadores']} jogadores, {c['rounds']} rounds ({c['linhas']['player_hurt']} player_hurt)")
+        for nome, t in c["etapas"].items():
+            print(f"  {nome:<30}{t['mediana'] * 1000:>12.3f} ms")
+
+
+def comparar(caminho_antes, caminho_depois):
+    with open(caminho_antes) as f: antes = json.load(f)
+    with open(caminho_depois) as f: depois = json.load(f)
+
+    def linha(nome, a, d):
+        print(f"  {nome:<30}{a * 1000:>11.3f} ms{d * 1000:>11.3f} ms{a / d if d else float('inf'):>9.2f}x")
+
+    print(f"{'etapa':<32}{'antes':>14}{'depois':>14}{'ganho':>10}")
+    for nome in antes["global"].keys() & depois["global"].keys():
+        linha(nome, antes["global"][nome]["mediana"], depois["global"][nome]["mediana"])
+    cenarios_depois = {(c["jogadores"], c["rounds"]): c for c in depois["cenarios"]}
+    for c in antes["cenarios"]:
+        outro = cenarios_depois.get((c["jogadores"], c["rounds"]))
+        if not outro: continue
+        print(f"\n{c['jogadores']} jogadores, {c['rounds']} rounds")
+        for nome, t in c["etapas"].items():
+            if nome in outro["etapas"]: linha(nome, t["mediana"], outro["etapas"][nome]["mediana"])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jogadores", type=int, nargs="+", default=[10, 50, 100])
+    ap.add_argument("--rounds", type=int, nargs="+", default=[30, 60])
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--partidas", type=int, default=20, help="partidas registradas no banco por cenário")
+    ap.add_argument("--mb", type=int, default=64, help="tamanho do arquivo para medir o hash")
+    ap.add_argument("--demo", help="demo real para medir header e parse de cada evento")
+    ap.add_argument("--saida", help="arquivo JSON com o resultado")
+    ap.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"))
+    args = ap.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+    resultado = rodar(args)
+    imprimir(resultado)
+    if args.saida:
+        with open(args.saida, "w") as f: json.dump(resultado, f, indent=2)
+        print(f"\nresultado salvo em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
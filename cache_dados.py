@@ -0,0 +1,91 @@
+import threading
+import time
+
+# --- CACHE DE LEITURA (TTL) PARA AS PÁGINAS ---
+# O módulo é importado uma vez por processo do Streamlit, então o cache vale
+# para todos os reruns e sessões. Qualquer escrita no banco deve chamar invalidar().
+TTL_PADRAO = 300
+
+
+class CacheTTL:
+    def __init__(self, ttl=TTL_PADRAO):
+        self.ttl = ttl
+        self._dados = {}
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave, carregar):
+        agora = time.monotonic()
+        with self._lock:
+            item = self._dados.get(chave)
+            if item and agora - item[0] < self.ttl:
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            geracao = self._geracao
+        valor = carregar()
+        with self._lock:
+            # se houve invalidação durante a leitura, o valor pode estar velho: não guarda
+            if geracao == self._geracao: self._dados[chave] = (time.monotonic(), valor)
+        return valor
+
+    def invalidar(self):
+        with self._lock:
+            self._dados.clear()
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                    "invalidacoes": self.invalidacoes, "entradas": len(self._dados), "ttl": self.ttl}
+
+
+cache = CacheTTL()
+_acumulado = None
+
+
+def invalidar():
+    cache.invalidar()
+
+
+def player_stats(bd):
+    return cache.obter("player_stats", bd.ler_player_stats)
+
+
+def totais_mapas(bd):
+    return cache.obter("totais_mapas", bd.ler_totais_mapas)
+
+
+def jogadores_mapas(bd):
+    return cache.obter("jogadores_mapas", bd.ler_jogadores_mapas)
+
+
+def mapas_jogador(bd, nickname):
+    return cache.obter(("mapas_jogador", nickname), lambda: bd.ler_mapas_jogador(nickname))
+
+
+def ranking_janela(bd, dias=None, partidas=None):
+    # acumulado criado no primeiro uso (traz pandas/numpy); cada leitura após invalidar() só busca as linhas
+    # novas, ou recarrega se match_results foi reescrita (janelas.AcumuladoResultados.atualizar)
+    global _acumulado
+    if _acumulado is None:
+        from janelas import AcumuladoResultados
+        _acumulado = AcumuladoResultados()
+
+    def carregar():
+        _acumulado.atualizar(bd, dias, partidas)
+        return _acumulado.totais(dias, partidas)
+    return cache.obter(("ranking_janela", dias, partidas), carregar)
+
+
+def temporadas(bd):
+    return cache.obter("temporadas", bd.ler_temporadas)
+
+
+def temporada(bd, nome_temporada):
+    return cache.obter(("temporada", nome_temporada), lambda: bd.ler_temporada(nome_temporada))
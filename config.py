@@ -0,0 +1,47 @@
+import os
+
+try: import tomllib
+except ModuleNotFoundError: import tomli as tomllib  # Python 3.10
+
+# --- CONFIGURAÇÃO DO BANCO ---
+# O backend vem de CS2HUB_BANCO ("supabase" ou "sqlite") ou da seção [banco] dos secrets:
+#
+#   [banco]
+#   backend = "sqlite"
+#   caminho = "dados/cs2hub.db"
+#
+# Para o Supabase valem SUPABASE_URL/SUPABASE_KEY do ambiente ou a seção [supabase]. O acesso
+# assíncrono (banco_async.py) é o padrão; CS2HUB_BANCO_ASYNC=0 ou assincrono = false no [banco]
+# volta para o cliente síncrono, uma requisição de cada vez.
+# Fora do Streamlit os secrets são lidos direto de .streamlit/secrets.toml.
+ARQUIVO_SECRETS = os.path.join(".streamlit", "secrets.toml")
+
+
+def ler_secrets(caminho=ARQUIVO_SECRETS):
+    try:
+        with open(caminho, "rb") as f: return tomllib.load(f)
+    except FileNotFoundError: return {}
+
+
+def criar_banco(secrets=None):
+    secrets = ler_secrets() if secrets is None else secrets
+    opcoes = secrets.get("banco", {})
+    backend = os.environ.get("CS2HUB_BANCO", opcoes.get("backend", "supabase"))
+
+    if backend == "sqlite":
+        from banco_sqlite import BancoSQLite
+        return BancoSQLite(os.environ.get("CS2HUB_SQLITE", opcoes.get("caminho", os.path.join("dados", "cs2hub.db"))))
+    if backend != "supabase":
+        raise RuntimeError(f"Backend de banco desconhecido: {backend}")
+
+    supa = secrets.get("supabase", {})
+    url = os.environ.get("SUPABASE_URL", supa.get("url"))
+    key = os.environ.get("SUPABASE_KEY", supa.get("key"))
+    if not url or not key:
+        raise RuntimeError(f"Defina SUPABASE_URL e SUPABASE_KEY ou crie {ARQUIVO_SECRETS}.")
+    if os.environ.get("CS2HUB_BANCO_ASYNC", "1" if opcoes.get("assincrono", True) else "0") != "0":
+        from banco_async import BancoSupabaseAsync
+        return BancoSupabaseAsync(url, key)
+    from supabase import create_client
+    from banco import BancoSupabase
+    return BancoSupabase(create_client(url, key))
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+import medicoes
+from extracao import steamid_float, steamid_int
+
+# --- AGREGAÇÃO DE ESTATÍSTICAS POR JOGADOR ---
+ARMAS_UTILITARIAS = ['hegrenade', 'inferno', 'incgrenade', 'molotov']
+
+COLS_ATACANTE = ['attacker_steamid', 'attacker_xuid']
+COLS_VITIMA = ['user_steamid', 'user_xuid']
+COLS_ASSISTENTE = ['assister_steamid', 'assister_xuid']
+
+
+def normalizar_time(valor):
+    try:
+        s = str(valor).upper().strip().replace('.0', '')
+        if s in ['CT', '3']: return 3
+        if s in ['T', 'TERRORIST', '2']: return 2
+        return None
+    except Exception: return None
+
+
+def normalizar_times(serie):
+    # normaliza só os valores distintos; 0 = time desconhecido
+    codigos, distintos = pd.factorize(serie)
+    tabela = np.array([normalizar_time(v) or 0 for v in distintos] + [0], dtype=np.int8)
+    return tabela[codigos]
+
+
+def primeira_coluna(df, candidatas):
+    return next((c for c in df.columns if c in candidatas), None)
+
+
+def stats_zeradas(amigos):
+    return {nome: {"Kills": 0, "Deaths": 0, "Assists": 0, "Matches": 0, "Wins": 0,
+                   "Headshots": 0, "EnemiesFlashed": 0, "UtilityDamage": 0,
+                   "TotalDamage": 0, "RoundsPlayed": 0} for nome in amigos.keys()}
+
+
+def indice_steamids(amigos):
+    # steamids dos amigos como uint64 ordenados, com o jogador (posição em amigos) e a
+    # posição do id na lista dele. Se um id aparece duas vezes, vale a última.
+    por_id = {steamid_int(uid): (i, j) for i, ids in enumerate(amigos.values()) for j, uid in enumerate(ids)}
+    por_id.pop(0, None)
+    # o mesmo id como chegaria de uma coluna float64 (ver extracao.BIT_FLOAT)
+    for uid, posicao in list(por_id.items()): por_id.setdefault(steamid_float(float(uid)), posicao)
+    chaves = sorted(por_id)
+    return {"ids": np.array(chaves, dtype=np.uint64),
+            "jogador": np.array([por_id[k][0] for k in chaves], dtype=np.int64),
+            "ordem": np.array([por_id[k][1] for k in chaves], dtype=np.int64),
+            "nomes": list(amigos.keys())}
+
+
+def localizar(serie, indice):
+    # jogador e ordem do id de cada linha; -1 para quem não está na lista
+    valores = serie.to_numpy(dtype=np.uint64)
+    ids = indice["ids"]
+    if not len(ids): return np.full(len(valores), -1), np.full(len(valores), -1)
+    pos = np.minimum(np.searchsorted(ids, valores), len(ids) - 1)
+    achou = ids[pos] == valores
+    return np.where(achou, indice["jogador"][pos], -1), np.where(achou, indice["ordem"][pos], -1)
+
+
+def _contar(df, col_id, indice, valores=None):
+    jogador, _ = localizar(df[col_id], indice)
+    achou = jogador >= 0
+    pesos = None if valores is None else np.asarray(valores, dtype=np.float64)[achou]
+    return np.bincount(jogador[achou], weights=pesos, minlength=len(indice["nomes"]))
+
+
+def _aplicar(stats, chave, totais, indice):
+    for nome, valor in zip(indice["nomes"], totais):
+        if nome in stats: stats[nome][chave] = int(valor)
+
+
+def agregar_eventos(stats, eventos, indice):
+    df_death, df_blind, df_hurt = eventos["player_death"], eventos["player_blind"], eventos["player_hurt"]
+
+    col_atk = primeira_coluna(df_death, COLS_ATACANTE)
+    if not df_death.empty and col_atk:
+        _aplicar(stats, "Kills", _contar(df_death, col_atk, indice), indice)
+        if 'headshot' in df_death.columns:
+            _aplicar(stats, "Headshots", _contar(df_death, col_atk, indice, df_death['headshot'] == True), indice)
+        col_vic = primeira_coluna(df_death, COLS_VITIMA)
+        if col_vic: _aplicar(stats, "Deaths", _contar(df_death, col_vic, indice), indice)
+        col_ass = primeira_coluna(df_death, COLS_ASSISTENTE)
+        if col_ass: _aplicar(stats, "Assists", _contar(df_death, col_ass, indice), indice)
+
+    col_blind = primeira_coluna(df_blind, COLS_ATACANTE)
+    if not df_blind.empty and col_blind:
+        _aplicar(stats, "EnemiesFlashed", _contar(df_blind, col_blind, indice), indice)
+
+    col_hurt = primeira_coluna(df_hurt, COLS_ATACANTE)
+    if not df_hurt.empty and col_hurt and 'dmg_health' in df_hurt.columns:
+        _aplicar(stats, "TotalDamage", _contar(df_hurt, col_hurt, indice, df_hurt['dmg_health']), indice)
+        if 'weapon' in df_hurt.columns:
+            dano_util = df_hurt['dmg_health'].where(df_hurt['weapon'].isin(ARMAS_UTILITARIAS), 0)
+            _aplicar(stats, "UtilityDamage", _contar(df_hurt, col_hurt, indice, dano_util), indice)
+    return stats
+
+
+# --- LINHA DO TEMPO DE TIMES E ROUNDS JOGADOS ---
+COLS_ID_JOGADOR = ['user_steamid', 'steamid']
+COLS_TIME_MORTE = ['attacker_team_num', 'team_num']
+
+
+def _trechos_timeline(df, col_uid, col_team, col_oldteam, fonte, indice):
+    if df.empty or not col_uid or col_team not in df.columns: return []
+    df = df.sort_values('tick', kind='stable')
+    jogador, ordem = localizar(df[col_uid], indice)
+    times = normalizar_times(df[col_team])
+    validos = (jogador >= 0) & (times > 0)
+    ticks = df['tick'].to_numpy()[validos]
+    jogador, ordem, times = jogador[validos], ordem[validos], times[validos]
+    trechos = [pd.DataFrame({'jogador': jogador, 'ordem_id': ordem, 'tick': ticks, 'team': times,
+                             'fonte': fonte, 'pos': np.arange(len(ticks))})]
+    if col_oldteam and col_oldteam in df.columns:
+        # o time anterior à primeira troca vale desde o início da partida
+        uids = df[col_uid].to_numpy(dtype=np.uint64)[validos]
+        primeiras = np.sort(np.unique(uids, return_index=True)[1])
+        antigos = normalizar_times(df[col_oldteam].iloc[np.flatnonzero(validos)[primeiras]])
+        primeiras, antigos = primeiras[antigos > 0], antigos[antigos > 0]
+        trechos.append(pd.DataFrame({'jogador': jogador[primeiras], 'ordem_id': ordem[primeiras], 'tick': 0, 'team': antigos,
+                                     'fonte': 0, 'pos': np.arange(len(primeiras))}))
+    return trechos
+
+
+def linha_do_tempo(eventos, indice):
+    df_team, df_item, df_death = eventos["player_team"], eventos["item_pickup"], eventos["player_death"]
+    trechos = (_trechos_timeline(df_team, primeira_coluna(df_team, COLS_ID_JOGADOR), 'team', 'oldteam', 1, indice)
+               + _trechos_timeline(df_item, primeira_coluna(df_item, COLS_ID_JOGADOR), 'team_num', None, 2, indice)
+               + _trechos_timeline(df_death, primeira_coluna(df_death, COLS_ATACANTE), primeira_coluna(df_death, COLS_TIME_MORTE), None, 3, indice))
+    if not trechos:
+        return pd.DataFrame({'jogador': pd.Series(dtype='int64'), 'tick': pd.Series(dtype='int64'), 'team': pd.Series(dtype='int8')})
+
+    tl = pd.concat(trechos, ignore_index=True)
+    # empate de tick: mesma ordem em que a timeline antiga acumulava as entradas
+    ordem = np.lexsort((tl['pos'], tl['fonte'], tl['ordem_id'], tl['tick'], tl['jogador']))
+    return tl.iloc[ordem][['jogador', 'tick', 'team']].reset_index(drop=True)
+
+
+def rounds_validos(df_round):
+    if df_round.empty or 'winner' not in df_round.columns:
+        return pd.DataFrame({'tick': pd.Series(dtype='int64'), 'winner': pd.Series(dtype='int8')})
+    vencedores = normalizar_times(df_round['winner'])
+    return pd.DataFrame({'tick': df_round['tick'].to_numpy()[vencedores > 0], 'winner': vencedores[vencedores > 0]})
+
+
+def time_por_round(timeline, rounds, n_jogadores):
+    # matriz jogadores x rounds com o time de cada um no tick do round_end (0 = fora da partida)
+    if timeline.empty or rounds.empty: return np.zeros((n_jogadores, len(rounds)), dtype=np.int8)
+    ticks_tl = timeline['tick'].to_numpy(dtype=np.int64)
+    ticks_r = rounds['tick'].to_numpy(dtype=np.int64)
+    base = max(ticks_tl.max(), ticks_r.max()) + 1
+    jogadores_tl = timeline['jogador'].to_numpy()
+    chaves_tl = jogadores_tl * base + ticks_tl
+    jogadores_q = np.repeat(np.arange(n_jogadores, dtype=np.int64), len(ticks_r))
+    chaves_q = jogadores_q * base + np.tile(ticks_r, n_jogadores)
+    idx = np.searchsorted(chaves_tl, chaves_q, side='right') - 1
+    achou = (idx >= 0) & (jogadores_tl[np.clip(idx, 0, None)] == jogadores_q)
+    times = np.where(achou, timeline['team'].to_numpy()[np.clip(idx, 0, None)], 0)
+    return times.reshape(n_jogadores, len(ticks_r)).astype(np.int8)
+
+
+def aplicar_rounds(stats, eventos, indice):
+    rounds = rounds_validos(eventos["round_end"])
+    with medicoes.etapa("linha_do_tempo"): timeline = linha_do_tempo(eventos, indice)
+    with medicoes.etapa("time_por_round"): times = time_por_round(timeline, rounds, len(indice["nomes"]))
+    jogados = (times > 0).sum(axis=1)
+    pontos = (times == rounds['winner'].to_numpy()).sum(axis=1)
+    for i, nome in enumerate(indice["nomes"]):
+        total = int(jogados[i]) or len(rounds)
+        stats[nome]["RoundsPlayed"] = total
+        if total > 0 and pontos[i] > total / 2: stats[nome]["Wins"] = 1
+    return stats
+
+
+def calcular_stats(eventos, amigos):
+    # None quando a demo não tem kills legíveis ou nenhum jogador da lista participou
+    if not primeira_coluna(eventos["player_death"], COLS_ATACANTE): return None
+    stats_partida = stats_zeradas(amigos)
+    indice = indice_steamids(amigos)
+    with medicoes.etapa("agregacao"): agregar_eventos(stats_partida, eventos, indice)
+    aplicar_rounds(stats_partida, eventos, indice)
+
+    sucesso = False
+    for dados in stats_partida.values():
+        if dados["Kills"] > 0 or dados["Deaths"] > 0 or dados["UtilityDamage"] > 0:
+            dados["Matches"] = 1
+            sucesso = True
+    return stats_partida if sucesso else None
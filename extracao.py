@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+import medicoes
+
+# --- EXTRAÇÃO DE EVENTOS (PASSADA ÚNICA) ---
+# Para cada evento, só as colunas que o cálculo de estatísticas lê de fato.
+# Colunas ausentes no .dem são simplesmente ignoradas.
+EVENTOS = {
+    "round_end": ["tick", "winner"],
+    "player_death": ["tick", "attacker_steamid", "attacker_xuid", "user_steamid", "user_xuid",
+                     "assister_steamid", "assister_xuid", "headshot", "attacker_team_num", "team_num"],
+    "player_blind": ["tick", "attacker_steamid", "attacker_xuid"],
+    "player_hurt": ["tick", "attacker_steamid", "attacker_xuid", "dmg_health", "weapon"],
+    "player_team": ["tick", "user_steamid", "steamid", "team", "oldteam"],
+    "item_pickup": ["tick", "user_steamid", "steamid", "team_num"],
+}
+
+TIPOS = {
+    "tick": "int64",
+    "dmg_health": "int64",
+    "headshot": "bool",
+    "weapon": "category",
+}
+
+
+def eh_coluna_id(col):
+    return 'steamid' in col or 'xuid' in col
+
+
+# Um steamid que passou por float64 perde os últimos bits (só há 53 de mantissa). Esses
+# valores ganham o bit 63, que nenhum steamid real usa, para casar só com o steamid dos
+# amigos arredondado do mesmo jeito (ver estatisticas.indice_steamids), nunca com um id exato.
+BIT_FLOAT = 1 << 63
+
+
+def steamid_float(valor):
+    numero = int(valor)
+    return numero | BIT_FLOAT if numero >= 2**53 else numero
+
+
+def steamid_int(valor):
+    # "7656...089", "7656...089.0" e 7656...089 -> int; 7.656...e16 -> arredondado com BIT_FLOAT; inválido -> 0
+    try:
+        if isinstance(valor, float): return steamid_float(valor) if valor == valor and valor > 0 else 0
+        texto = str(valor).strip()
+        if texto.endswith(".0"): texto = texto[:-2]
+        try: numero = int(texto)
+        except ValueError: return steamid_int(float(texto))
+        return numero if 0 < numero < BIT_FLOAT else 0
+    except (TypeError, ValueError, OverflowError): return 0
+
+
+def limpar_steamid(serie):
+    # steamid/xuid como uint64 (0 = ausente). Colunas de texto são convertidas só nos valores
+    # distintos, que numa partida são poucas dezenas.
+    if pd.api.types.is_integer_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.clip(lower=0).astype(np.uint64)
+    codigos, distintos = pd.factorize(serie)
+    tabela = np.array([steamid_int(v) for v in distintos] + [0], dtype=np.uint64)
+    return pd.Series(tabela[codigos], index=serie.index)
+
+
+def tipar_evento(df, colunas):
+    df = df[[c for c in colunas if c in df.columns]].copy()
+    for col in df.columns:
+        if eh_coluna_id(col):
+            df[col] = limpar_steamid(df[col])
+        elif col in TIPOS:
+            try:
+                if TIPOS[col] in ("int64", "bool"): df[col] = df[col].fillna(0)
+                df[col] = df[col].astype(TIPOS[col])
+            except (TypeError, ValueError): pass
+    return df
+
+
+def extrair_eventos(parser, eventos=EVENTOS):
+    try:
+        with medicoes.etapa("parse_events"): dados = parser.parse_events(list(eventos.keys()))
+    except Exception:
+        medicoes.contar("falha:parse_events")
+        dados = []
+    brutos = dict(dados) if isinstance(dados, list) else {}
+    extraidos = {}
+    for nome, colunas in eventos.items():
+        with medicoes.etapa(f"evento:{nome}"): extraidos[nome] = tipar_evento(brutos.get(nome, pd.DataFrame()), colunas)
+    return extraidos
+
+
+def ler_mapa(parser):
+    try:
+        with medicoes.etapa("header"): header = parser.parse_header()
+        if "map_name" in header: return header["map_name"].replace("de_", "").capitalize()
+    except Exception: medicoes.contar("falha:header")
+    return "Desconhecido"
@@ -0,0 +1,118 @@
+# Ingestão sem interface: processa uma pasta de .dem ou fica vigiando a pasta onde as
+# demos são gravadas. Usa o mesmo núcleo do app (ingestao.ingerir_demos).
+# Uso: python ingerir.py PASTA [--vigiar] [--intervalo 15] [--workers N] [--medicoes medicoes.json]
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from ingestao import EM_ANDAMENTO, hash_demo, ingerir_demos
+from jogadores import AMIGOS
+import medicoes
+
+# caminho -> (tamanho, mtime, md5): arquivo que não mudou não é lido de novo para calcular o hash
+ARQUIVO_INDICE = os.path.join("dados", "indice_demos.json")
+
+
+def carregar_indice(caminho=ARQUIVO_INDICE):
+    try:
+        with open(caminho) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+
+def salvar_indice(indice, caminho=ARQUIVO_INDICE):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho + ".tmp", "w") as f: json.dump(indice, f)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def hash_com_indice(caminho, indice):
+    info = os.stat(caminho)
+    chave = os.path.abspath(caminho)
+    salvo = indice.get(chave)
+    if salvo and salvo[0] == info.st_size and salvo[1] == info.st_mtime: return salvo[2]
+    file_hash = hash_demo(caminho)
+    indice[chave] = [info.st_size, info.st_mtime, file_hash]
+    return file_hash
+
+
+def listar_demos(pasta):
+    return sorted(glob.glob(os.path.join(pasta, "**", "*.dem"), recursive=True))
+
+
+def ingerir_lote(caminhos, bd, indice, processados, workers=None):
+    # processados também recebe as demos que não adianta tentar de novo (sem amigos ou corrompidas);
+    # só erro de banco fica de fora, para a próxima varredura tentar outra vez
+    inicio = time.perf_counter()
+    demos, pulados = [], 0
+    for caminho in caminhos:
+        file_hash = hash_com_indice(caminho, indice)
+        if file_hash in processados: pulados += 1
+        else:
+            # a data da partida é a do arquivo (a demo é gravada quando a partida acaba)
+            jogada_em = datetime.fromtimestamp(os.path.getmtime(caminho), timezone.utc)
+            demos.append({"arquivo": os.path.relpath(caminho), "caminho": caminho, "hash": file_hash, "jogada_em": jogada_em})
+    salvar_indice(indice)
+    if pulados: print(f"⏭️ {pulados} demo(s) já processada(s) puladas")
+    if not demos: return 0
+
+    impressos = set()
+    def ao_atualizar(status):
+        for i, linha in enumerate(status):
+            if linha["status"] not in EM_ANDAMENTO and i not in impressos:
+                impressos.add(i)
+                print(f"{linha['status']:<28} {linha['mapa'] or '-':<10} {linha['arquivo']}")
+
+    status, partidas = ingerir_demos(demos, bd, AMIGOS, ao_atualizar, processados, max_workers=workers)
+    for demo, linha in zip(demos, status):
+        if not linha["status"].startswith("❌ Erro BD"): processados.add(demo["hash"])
+
+    minutos = (time.perf_counter() - inicio) / 60
+    print(f"📈 {len(demos)} demo(s) em {minutos * 60:.1f}s • {len(demos) / minutos:.1f} demos/min • {len(partidas)} salva(s)")
+    return len(partidas)
+
+
+def vigiar(pasta, bd, indice, processados, intervalo, workers=None):
+    # só entra demo cujo tamanho ficou parado entre duas varreduras (o jogo ainda pode estar gravando)
+    tamanhos = {}
+    print(f"👀 Vigiando {pasta} a cada {intervalo}s (Ctrl+C para sair)")
+    while True:
+        prontas = []
+        for caminho in listar_demos(pasta):
+            chave = os.path.abspath(caminho)
+            tamanho = os.path.getsize(caminho)
+            if chave in indice and indice[chave][0] == tamanho and indice[chave][2] in processados: continue
+            if tamanhos.get(chave) == tamanho: prontas.append(caminho)
+            tamanhos[chave] = tamanho
+        if prontas: ingerir_lote(prontas, bd, indice, processados, workers)
+        time.sleep(intervalo)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ingere demos .dem sem passar pelo Streamlit.")
+    ap.add_argument("pasta")
+    ap.add_argument("--vigiar", action="store_true", help="continua rodando e ingere demos novas")
+    ap.add_argument("--intervalo", type=float, default=15)
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--medicoes", help="salva em JSON o tempo de cada etapa por demo ao sair")
+    args = ap.parse_args()
+
+    from config import criar_banco
+    bd = criar_banco()
+    indice = carregar_indice()
+    processados = bd.hashes_processados()
+
+    try:
+        if args.vigiar: vigiar(args.pasta, bd, indice, processados, args.intervalo, args.workers)
+        else: ingerir_lote(listar_demos(args.pasta), bd, indice, processados, args.workers)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.medicoes:
+            with open(args.medicoes, "w") as f: json.dump(medicoes.registro.exportar(), f)
+
+
+if __name__ == "__main__":
+    main()
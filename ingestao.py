@@ -0,0 +1,262 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from demoparser2 import DemoParser
+
+from extracao import extrair_eventos, ler_mapa
+from estatisticas import calcular_stats
+from por_round import tabela_rounds
+import armazem_eventos
+import medicoes
+
+# --- HASH E ARQUIVO TEMPORÁRIO EM STREAMING ---
+# A demo nunca é copiada inteira na memória: cada bloco atualiza o MD5 (chave de
+# processed_matches) e já vai para o disco.
+TAMANHO_BLOCO = 8 * 1024 * 1024
+
+
+def _blocos(origem):
+    if hasattr(origem, "getbuffer"):
+        # BytesIO (o UploadedFile do Streamlit): fatias do próprio buffer, sem cópia
+        with origem.getbuffer() as buffer:
+            for inicio in range(origem.tell(), len(buffer), TAMANHO_BLOCO):
+                yield buffer[inicio:inicio + TAMANHO_BLOCO]
+        return
+    buffer = bytearray(TAMANHO_BLOCO)
+    visao = memoryview(buffer)
+    while True:
+        lidos = origem.readinto(buffer)
+        if not lidos: return
+        yield visao[:lidos]
+
+
+def copiar_com_hash(origem, destino=None):
+    md5 = hashlib.md5()
+    for bloco in _blocos(origem):
+        md5.update(bloco)
+        if destino is not None: destino.write(bloco)
+        bloco.release()
+    return md5.hexdigest()
+
+
+def hash_demo(caminho):
+    with open(caminho, "rb", buffering=0) as f: return copiar_com_hash(f)
+
+
+def salvar_upload(arquivo_upload):
+    arquivo_upload.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".dem") as tfile:
+        file_hash = copiar_com_hash(arquivo_upload, tfile)
+    return tfile.name, file_hash
+
+
+# --- ANÁLISE DE DEMOS (SEM UI, RODA EM PROCESSOS WORKER) ---
+TEMPO_LIMITE_DEMO = 600
+
+
+def analise_em_cache(match_hash, amigos, diretorio_eventos):
+    # stats já calculados para esta demo e esta lista de amigos: nem abre o demoparser2
+    if not diretorio_eventos: return None
+    salvo = armazem_eventos.ler_stats(match_hash, armazem_eventos.assinatura_stats(amigos), diretorio_eventos)
+    if salvo is None: return None
+    try: rounds = armazem_eventos.ler_rounds(match_hash, diretorio_eventos) if salvo["stats"] else None
+    except (OSError, ValueError): return None
+    armazem_eventos.tocar(match_hash, diretorio_eventos)
+    return {"mapa": salvo["mapa"], "stats": salvo["stats"], "rounds": rounds, "medicoes": {"tempos": {}, "contadores": {"cache:hit": 1}}}
+
+
+def _eventos_do_armazem(match_hash, diretorio_eventos):
+    # eventos já extraídos (só os stats estão desatualizados): recalcula sem o parser
+    if not (match_hash and diretorio_eventos and armazem_eventos.partida_gravada(match_hash, diretorio_eventos)): return None
+    try:
+        with medicoes.etapa("armazem:ler"): return armazem_eventos.ler_partida(match_hash, diretorio_eventos)
+    except (OSError, ValueError): return None
+
+
+def analisar_demo(caminho, amigos, match_hash=None, diretorio_eventos=None):
+    # stats é None quando nenhum jogador da lista participou; rounds é a tabela por round dos amigos
+    # (por_round.py), tirada dos mesmos eventos; medicoes traz o tempo de cada etapa
+    with medicoes.coletar() as coleta, medicoes.etapa("analise_total"):
+        salvo = _eventos_do_armazem(match_hash, diretorio_eventos)
+        if salvo:
+            medicoes.contar("cache:eventos")
+            mapa_nome, eventos = salvo
+        else:
+            medicoes.contar("cache:miss")
+            with medicoes.etapa("abrir_demo"): parser = DemoParser(caminho)
+            mapa_nome = ler_mapa(parser)
+            eventos = extrair_eventos(parser)
+        stats_partida = calcular_stats(eventos, amigos)
+        rounds = None
+        if stats_partida is not None:
+            with medicoes.etapa("rounds"): rounds = tabela_rounds(eventos, amigos)
+        if match_hash and diretorio_eventos:
+            # o armazém é só cache e recálculo futuro: falta de disco não pode derrubar a ingestão
+            try:
+                with medicoes.etapa("armazem"):
+                    armazem_eventos.gravar_partida(match_hash, mapa_nome, eventos, diretorio_eventos)
+                    armazem_eventos.gravar_stats(match_hash, armazem_eventos.assinatura_stats(amigos), mapa_nome, stats_partida,
+                                                 diretorio_eventos, rounds)
+            except OSError: medicoes.contar("falha:armazem")
+    return {"mapa": mapa_nome, "stats": stats_partida, "rounds": rounds, "medicoes": coleta.como_dict()}
+
+
+_inicios = None
+
+
+def _iniciar_worker(fila):
+    global _inicios
+    _inicios = fila
+
+
+def _analisar_no_worker(chave, caminho, amigos, match_hash, diretorio_eventos):
+    # avisa quando começa de fato (future.running() já vale para o que só está na fila de envio)
+    _inicios.put(chave)
+    # exceções do demoparser2 não são picklable; devolve só a mensagem ao processo principal
+    try: return analisar_demo(caminho, amigos, match_hash, diretorio_eventos)
+    except Exception as e: raise RuntimeError(str(e)) from None
+
+
+def _rodar_pool(demos, amigos, diretorio_eventos, max_workers, tempo_limite):
+    contexto = multiprocessing.get_context("spawn")
+    # SimpleQueue escreve direto no pipe: o aviso sai mesmo se o parser travar logo depois segurando o GIL
+    inicios = contexto.SimpleQueue()
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto,
+                                   initializer=_iniciar_worker, initargs=(inicios,))
+    restantes = {}
+    try:
+        futuros = {executor.submit(_analisar_no_worker, chave, caminho, amigos, match_hash, diretorio_eventos): chave
+                   for chave, (caminho, match_hash) in demos.items()}
+        inicio = {}
+        pendentes = set(futuros)
+        while pendentes:
+            feitos, pendentes = wait(pendentes, timeout=1, return_when=FIRST_COMPLETED)
+            for futuro in feitos:
+                try: yield futuros[futuro], futuro.result(), None
+                except Exception as e: yield futuros[futuro], None, e
+
+            agora = time.monotonic()
+            while not inicios.empty(): inicio.setdefault(inicios.get(), agora)
+            estouradas = [f for f in pendentes if agora - inicio.get(futuros[f], agora) > tempo_limite]
+            if estouradas:
+                # cancel() não para um worker ocupado: derruba os processos e refaz as outras num pool novo
+                for processo in list((executor._processes or {}).values()): processo.terminate()
+                for futuro in estouradas:
+                    yield futuros[futuro], None, TimeoutError(f"demo passou de {tempo_limite}s")
+                restantes = {futuros[f]: demos[futuros[f]] for f in pendentes if f not in estouradas}
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        inicios.close()
+    if restantes: yield from _rodar_pool(restantes, amigos, diretorio_eventos, max_workers, tempo_limite)
+
+
+def analisar_em_paralelo(demos, amigos, diretorio_eventos=None, max_workers=None, tempo_limite=TEMPO_LIMITE_DEMO):
+    # demos: {chave: (caminho_da_demo, match_hash)}. Gera (chave, resultado, erro) na ordem em que terminam.
+    # Uma demo corrompida ou lenta só falha a si mesma; as outras seguem nos demais workers.
+    # Com diretorio_eventos, cada worker também grava os eventos da partida no armazém local.
+    if not demos: return
+    max_workers = max_workers or min(len(demos), os.cpu_count() or 1)
+    quebradas = {}
+    for chave, resultado, erro in _rodar_pool(demos, amigos, diretorio_eventos, max_workers, tempo_limite):
+        if isinstance(erro, BrokenProcessPool): quebradas[chave] = demos[chave]
+        else: yield chave, resultado, erro
+
+    # um worker que morre derruba o pool inteiro; refaz cada afetada isolada para achar a culpada
+    for chave, demo in quebradas.items():
+        yield from _rodar_pool({chave: demo}, amigos, diretorio_eventos, 1, tempo_limite)
+
+
+# --- INGESTÃO COMPLETA (USADA PELO APP E PELA LINHA DE COMANDO) ---
+STATUS_FILA = "⏳ Na fila"
+STATUS_ANALISANDO = "⚙️ Analisando"
+STATUS_GRAVANDO = "💾 Gravando"
+STATUS_SALVA = "✅ Salva"
+STATUS_DUPLICADA = "⛔ Duplicada"
+STATUS_SEM_JOGADORES = "⚠️ Nenhum jogador da lista"
+EM_ANDAMENTO = (STATUS_FILA, STATUS_ANALISANDO, STATUS_GRAVANDO)
+
+
+def ingerir_demos(demos, bd, amigos, ao_atualizar=None, hashes_processados=None,
+                  diretorio_eventos=armazem_eventos.DIRETORIO_EVENTOS, max_workers=None):
+    # demos: lista de {"arquivo": nome, "caminho": caminho, "hash": md5}, com "jogada_em" (datetime) opcional.
+    # hashes_processados (opcional) evita uma consulta ao banco por demo na checagem de duplicadas.
+    # O parse roda em paralelo nos workers; cada escrita no banco é uma transação por demo, e a
+    # gravação de uma demo segue em segundo plano (bd.registrar_em_segundo_plano) enquanto chegam as próximas.
+    # Demos cujo resultado está no armazém (ex.: reenvio depois de um erro no banco) não vão para os workers.
+    status = [{"arquivo": d["arquivo"], "mapa": "", "status": STATUS_FILA} for d in demos]
+    partidas = []
+    pendentes = {}
+    em_cache = {}
+    vistos = set()
+    avisar = ao_atualizar or (lambda status: None)
+
+    for i, demo in enumerate(demos):
+        with medicoes.coletar() as coleta:
+            ja_processada = (demo["hash"] in hashes_processados if hashes_processados is not None
+                             else bd.demo_ja_processada(demo["hash"]))
+            resultado = None if ja_processada or demo["hash"] in vistos else analise_em_cache(demo["hash"], amigos, diretorio_eventos)
+        medicoes.registro.registrar(demo["hash"], coleta.tempos, coleta.contadores)
+        if demo["hash"] in vistos or ja_processada:
+            status[i]["status"] = STATUS_DUPLICADA
+            continue
+        vistos.add(demo["hash"])
+        if resultado: em_cache[i] = resultado
+        else: pendentes[i] = (demo["caminho"], demo["hash"])
+        status[i]["status"] = STATUS_ANALISANDO
+    avisar(status)
+
+    def fechar(i, resultado, coleta):
+        # tempos do worker (parse, timeline, agregação) + idas ao banco feitas aqui
+        do_worker = resultado["medicoes"] if resultado else {"tempos": {}, "contadores": {}}
+        medicoes.registro.registrar(demos[i]["hash"], {**do_worker["tempos"], **coleta.tempos},
+                                    {**do_worker["contadores"], **coleta.contadores})
+        avisar(status)
+
+    def gravada(futuro, i, resultado, coleta):
+        with medicoes.coletar(coleta):
+            try:
+                if futuro.result():
+                    partidas.append({"arquivo": demos[i]["arquivo"], "hash": demos[i]["hash"], "mapa": resultado["mapa"],
+                                     "stats": resultado["stats"], "rounds": resultado["rounds"]})
+                    status[i]["status"] = STATUS_SALVA
+                else: status[i]["status"] = STATUS_DUPLICADA
+            except Exception as e:
+                medicoes.contar("falha:banco")
+                status[i]["status"] = f"❌ Erro BD: {e}"
+        fechar(i, resultado, coleta)
+
+    escritas = {}
+    analisadas = ((i, resultado, None) for i, resultado in em_cache.items())
+    for i, resultado, erro in itertools.chain(analisadas, analisar_em_paralelo(pendentes, amigos, diretorio_eventos, max_workers)):
+        with medicoes.coletar() as coleta:
+            if erro:
+                medicoes.contar("falha:analise")
+                status[i]["status"] = f"❌ Falhou: {erro}"
+            elif resultado["stats"] is None:
+                status[i]["status"] = STATUS_SEM_JOGADORES
+            else:
+                status[i]["mapa"] = resultado["mapa"]
+                status[i]["status"] = STATUS_GRAVANDO
+                futuro = bd.registrar_em_segundo_plano(demos[i]["hash"], resultado["stats"], resultado["mapa"], demos[i].get("jogada_em"))
+                escritas[futuro] = (i, resultado, coleta)
+        if status[i]["status"] != STATUS_GRAVANDO: fechar(i, resultado, coleta)
+        for futuro in [f for f in escritas if f.done()]: gravada(futuro, *escritas.pop(futuro))
+    for futuro in as_completed(list(escritas)): gravada(futuro, *escritas.pop(futuro))
+
+    if diretorio_eventos and pendentes:
+        # partidas da temporada atual nunca saem; sem conseguir ler quais são, não poda nada
+        try: protegidas = bd.hashes_processados()
+        except Exception: medicoes.contar("falha:banco:hashes_processados")
+        else:
+            try:
+                _, excesso = armazem_eventos.podar(protegidas, diretorio_eventos)
+                if excesso: medicoes.contar("armazem:acima_do_limite")
+            except OSError: medicoes.contar("falha:armazem")
+    return status, partidas
@@ -0,0 +1,105 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from banco import COLUNAS_STATS
+
+# --- RANKING POR PERÍODO (MATCH_RESULTS) ---
+# Para cada jogador: os instantes das partidas em ordem e a soma acumulada das estatísticas
+# (com uma linha de zeros no início). O total de qualquer janela é acumulado[fim] - acumulado[inicio],
+# com o início achado por searchsorted, sem somar partida por partida.
+# A carga inicial só traz o que as janelas usam: as partidas dos últimos `dias` e as últimas
+# `partidas` de cada jogador, pelos índices de played_at e (nickname, played_at). Depois, cada
+# atualização só busca as linhas a partir do último id visto e continua a soma a partir do último
+# valor; se match_results mudou no lugar (recalcular.py), a revisão do banco muda e tudo recarrega.
+COLS = list(COLUNAS_STATS)
+# ids saem da sequência antes do commit: uma gravação mais lenta aparece depois de ids maiores.
+# Cada leitura volta MARGEM_IDS ids e descarta os que já entraram na soma.
+MARGEM_IDS = 500
+# janelas do Ranking (paginas.JANELAS_RANKING); uma janela maior amplia a carga na hora
+DIAS_CARREGADOS = 30
+PARTIDAS_CARREGADAS = 20
+
+
+def _instantes(serie):
+    return pd.to_datetime(serie, utc=True, format="ISO8601").to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+class AcumuladoResultados:
+    def __init__(self, dias=DIAS_CARREGADOS, partidas=PARTIDAS_CARREGADAS):
+        self.dias, self.partidas = dias, partidas
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock: self._limpar()
+
+    def _limpar(self):
+        self.revisao = None
+        self.ultimo_id = 0
+        self._vistos = set()
+        self._jogadores = {}
+
+    def atualizar(self, bd, dias=None, partidas=None):
+        with self._lock:
+            if (dias or 0) > self.dias or (partidas or 0) > self.partidas:
+                self.dias, self.partidas = max(self.dias, dias or 0), max(self.partidas, partidas or 0)
+                self._limpar()
+            # lida antes das linhas: uma reescrita no meio da leitura só adianta a próxima recarga
+            revisao = bd.ler_revisao_resultados()
+            if revisao != self.revisao:
+                self._limpar()
+                desde = datetime.now(timezone.utc) - timedelta(days=self.dias)
+                recentes, ultimas = bd.executar_juntos([lambda: bd.ler_resultados(desde=desde),
+                                                        lambda: bd.ler_ultimos_resultados(self.partidas)])
+                linhas = recentes + ultimas
+                self.revisao = revisao
+            else:
+                linhas = bd.ler_resultados(max(0, self.ultimo_id - MARGEM_IDS))
+            if not linhas: return 0
+            df = pd.DataFrame(linhas).drop_duplicates("id")
+            df = df[~df["id"].isin(self._vistos)]
+            if df.empty: return 0
+            df["quando"] = _instantes(df["played_at"])
+            for nickname, grupo in df.groupby("nickname", sort=False):
+                self._anexar(nickname, grupo["quando"].to_numpy(), grupo[COLS].to_numpy(dtype=np.int64))
+            self.ultimo_id = max(self.ultimo_id, int(df["id"].max()))
+            # abaixo da margem nada é relido: esses ids não precisam mais ser lembrados
+            self._vistos = {i for i in self._vistos.union(df["id"].tolist()) if i > self.ultimo_id - MARGEM_IDS}
+            return len(df)
+
+    def _anexar(self, nickname, quando, valores):
+        ordem = np.argsort(quando, kind="stable")
+        quando, valores = quando[ordem], valores[ordem]
+        atual = self._jogadores.get(nickname)
+        if atual is None:
+            self._jogadores[nickname] = (quando, np.vstack([np.zeros((1, len(COLS)), dtype=np.int64), np.cumsum(valores, axis=0)]))
+            return
+        quando_atual, acumulado = atual
+        if quando[0] >= quando_atual[-1]:
+            # caso comum: partidas novas depois das já vistas, a soma só continua
+            self._jogadores[nickname] = (np.concatenate([quando_atual, quando]),
+                                         np.vstack([acumulado, acumulado[-1] + np.cumsum(valores, axis=0)]))
+            return
+        # demo antiga ingerida depois: refaz a ordem só deste jogador
+        del self._jogadores[nickname]
+        self._anexar(nickname, np.concatenate([quando_atual, quando]), np.vstack([np.diff(acumulado, axis=0), valores]))
+
+    def totais(self, dias=None, partidas=None, agora=None):
+        # linhas no formato de player_stats com a soma de cada jogador na janela; a janela precisa
+        # caber no que atualizar carregou (sem nenhuma das duas, soma só o que foi carregado)
+        with self._lock: jogadores = dict(self._jogadores)
+        if dias is not None:
+            limite = np.datetime64((agora or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None) - timedelta(days=dias), "ns").astype(np.int64)
+        linhas = []
+        for nickname, (quando, acumulado) in jogadores.items():
+            fim = len(quando)
+            if dias is not None: inicio = np.searchsorted(quando, limite, side="left")
+            elif partidas is not None: inicio = max(0, fim - partidas)
+            else: inicio = 0
+            total = acumulado[fim] - acumulado[inicio]
+            if total[COLS.index("matches")] > 0:
+                linhas.append({"nickname": nickname, **dict(zip(COLS, total.tolist()))})
+        return linhas
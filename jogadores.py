@@ -0,0 +1,11 @@
+# --- LISTA DE AMIGOS ---
+AMIGOS = {
+    "Ph (Ph1L)": ["76561198301569089", "76561198051052379"],
+    "Pablo (Cyrax)": ["76561198143002755", "76561198446160415"],
+    "Bruno (Safadinha)": ["76561198187604726"],
+    "Daniel (Ocharadas)": ["76561199062357951"],
+    "LEO (Trewan)": ["76561198160033077"],
+    "FERNANDO (Nandin)": ["76561198185508959"],
+    "DG (dgtremsz)": ["76561199402154960"],
+    "Arlon (M4CH)": ["76561197978110112"],
+}
@@ -0,0 +1,95 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# --- INSTRUMENTAÇÃO POR ETAPA ---
+# etapa("nome") cronometra um trecho e contar("nome") soma um contador na coleta ativa.
+# A ingestão abre uma coleta por demo (coletar()) e, ao final, registro.registrar(match_hash, ...)
+# guarda o resultado. Fora de uma coleta (ex.: leituras das páginas) cada medição vai direto
+# para o registro sem hash. O registro vive no processo do Streamlit, como o cache_dados.
+LIMITE_MEDICOES = 20000
+
+_coleta_atual = contextvars.ContextVar("coleta_atual", default=None)
+
+
+class Coleta:
+    def __init__(self):
+        self.tempos = {}
+        self.contadores = {}
+
+    def como_dict(self):
+        return {"tempos": dict(self.tempos), "contadores": dict(self.contadores)}
+
+
+class RegistroMedicoes:
+    def __init__(self, limite=LIMITE_MEDICOES):
+        self._medicoes = deque(maxlen=limite)
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, match_hash, tempos, contadores=None):
+        agora = time.time()
+        with self._lock:
+            for etapa, segundos in tempos.items():
+                self._medicoes.append((agora, match_hash, etapa, segundos))
+            for nome, n in (contadores or {}).items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + n
+
+    def resumo(self):
+        with self._lock: medicoes = list(self._medicoes)
+        por_etapa = {}
+        for _, _, etapa, segundos in medicoes: por_etapa.setdefault(etapa, []).append(segundos)
+        linhas = []
+        for etapa, tempos in sorted(por_etapa.items()):
+            t = np.asarray(tempos) * 1000
+            p50, p95 = np.percentile(t, [50, 95])
+            linhas.append({"etapa": etapa, "n": len(t), "p50_ms": float(p50), "p95_ms": float(p95),
+                           "max_ms": float(t.max()), "total_s": float(t.sum()) / 1000})
+        return linhas
+
+    def contadores(self):
+        with self._lock: return dict(self._contadores)
+
+    def exportar(self):
+        with self._lock:
+            return {"medicoes": [{"quando": quando, "match_hash": match_hash, "etapa": etapa, "segundos": segundos}
+                                 for quando, match_hash, etapa, segundos in self._medicoes],
+                    "contadores": dict(self._contadores)}
+
+    def limpar(self):
+        with self._lock:
+            self._medicoes.clear()
+            self._contadores.clear()
+
+
+registro = RegistroMedicoes()
+
+
+@contextmanager
+def coletar(coleta=None):
+    # coleta já existente: continua somando nela (ex.: escrita no banco que termina depois)
+    coleta = coleta or Coleta()
+    token = _coleta_atual.set(coleta)
+    try: yield coleta
+    finally: _coleta_atual.reset(token)
+
+
+@contextmanager
+def etapa(nome):
+    inicio = time.perf_counter()
+    try: yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        coleta = _coleta_atual.get()
+        if coleta is None: registro.registrar(None, {nome: segundos})
+        else: coleta.tempos[nome] = coleta.tempos.get(nome, 0.0) + segundos
+
+
+def contar(nome, n=1):
+    coleta = _coleta_atual.get()
+    if coleta is None: registro.registrar(None, {}, {nome: n})
+    else: coleta.contadores[nome] = coleta.contadores.get(nome, 0) + n
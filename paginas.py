@@ -0,0 +1,45 @@
+import pandas as pd
+
+from rating import META_PARTIDAS, calcular_metricas, percentual
+
+# --- PREPARAÇÃO DOS DADOS DAS PÁGINAS (SÓ PANDAS, SEM STREAMLIT) ---
+COLS_STATS = ['kills', 'deaths', 'assists', 'matches', 'wins', 'headshots', 'enemies_flashed', 'utility_damage', 'total_damage', 'rounds_played']
+MAPAS_OFICIAIS = ['Inferno', 'Overpass', 'Ancient', 'Nuke', 'Dust2', 'Anubis', 'Mirage']
+VISAO_GERAL = "Todos (Média Geral)"
+# período do Ranking -> argumentos de cache_dados.ranking_janela (None = temporada atual, player_stats)
+JANELAS_RANKING = {"Temporada": None, "Últimos 30 dias": {"dias": 30}, "Últimas 20 partidas": {"partidas": 20}}
+
+
+def preparar_ranking(dados_stats, nomes, meta_partidas=META_PARTIDAS):
+    db_data = pd.DataFrame(dados_stats) if dados_stats else pd.DataFrame()
+
+    all_friends = pd.DataFrame({"nickname": list(nomes)})
+    if not db_data.empty: df = pd.merge(all_friends, db_data, on="nickname", how="left")
+    else: df = all_friends
+
+    for c in COLS_STATS:
+        if c not in df.columns: df[c] = 0
+    df[COLS_STATS] = df[COLS_STATS].fillna(0)
+    return calcular_metricas(df, meta_partidas)
+
+
+def mapas_do_grupo(totais_mapas):
+    # totais_mapas: uma linha por mapa da view mapas_totais (matches = maior contagem individual)
+    df = pd.DataFrame(totais_mapas, columns=['map_name', 'matches', 'wins_total', 'matches_total'])
+    win_ratio = (df['wins_total'] / df['matches_total']).fillna(0)
+    return pd.DataFrame({'map_name': df['map_name'], 'matches': df['matches'], 'wins': (df['matches'] * win_ratio).astype(int)})
+
+
+def preparar_mapas(linhas_mapas, mapas_oficiais=MAPAS_OFICIAIS):
+    # linhas_mapas: map_name/matches/wins de um jogador ou o resultado de mapas_do_grupo
+    df_filtered = pd.DataFrame(linhas_mapas, columns=['map_name', 'matches', 'wins'])
+    df_completo = pd.DataFrame({'map_name': mapas_oficiais})
+    df_final = pd.merge(df_completo, df_filtered, on='map_name', how='left').fillna(0)
+    df_final['WinRate'] = percentual(df_final['wins'].to_numpy(dtype=float), df_final['matches'].to_numpy(dtype=float))
+    df_final['losses'] = df_final['matches'] - df_final['wins']
+    return df_final
+
+
+def preparar_historico(dados_temporada, meta_partidas=META_PARTIDAS):
+    df_hist = calcular_metricas(pd.DataFrame(dados_temporada), meta_partidas)
+    return df_hist.sort_values(by='RatingFinal', ascending=False).reset_index(drop=True)
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from estatisticas import (ARMAS_UTILITARIAS, COLS_ASSISTENTE, COLS_ATACANTE, COLS_ID_JOGADOR, COLS_VITIMA,
+                          indice_steamids, linha_do_tempo, localizar, normalizar_times, primeira_coluna, time_por_round)
+
+# --- ESTATÍSTICAS POR ROUND ---
+# Cada morte, dano e cegueira cai no round cujo round_end é o primeiro tick >= ao do evento
+# (searchsorted nos ticks já extraídos, sem outra passada na demo). As contas são feitas por
+# conta Steam de todos os jogadores da partida (para saber quem está vivo em cada time) e
+# no final ficam só as linhas dos amigos.
+TICKS_POR_SEGUNDO = 64
+JANELA_TRADE = 5 * TICKS_POR_SEGUNDO
+
+COLUNAS_ROUND = {
+    "round": "int16", "nickname": "category", "team": "int8", "venceu": "bool",
+    "dano": "int32", "dano_util": "int32", "kills": "int8", "deaths": "int8", "assists": "int8",
+    "headshots": "int8", "cegos": "int8", "abertura_kill": "bool", "abertura_morte": "bool",
+    "trade_kills": "int8", "trocado": "bool", "sobreviveu": "bool", "kast": "bool",
+    "clutch": "int8", "clutch_vitoria": "bool",
+}
+
+
+def tabela_vazia():
+    return pd.DataFrame({col: pd.Series(dtype=tipo) for col, tipo in COLUNAS_ROUND.items()})
+
+
+def round_do_tick(ticks, fins):
+    # índice do round de cada tick; len(fins) para o que vem depois do último round_end
+    return np.searchsorted(fins, ticks, side='left')
+
+
+def _ids(df, candidatas):
+    col = primeira_coluna(df, candidatas)
+    return df[col].to_numpy(dtype=np.uint64) if col and not df.empty else np.zeros(0, dtype=np.uint64)
+
+
+def _indice_partida(eventos):
+    # todas as contas que aparecem na partida, cada uma como um "jogador"
+    todos = np.unique(np.concatenate([
+        _ids(eventos["player_team"], COLS_ID_JOGADOR), _ids(eventos["item_pickup"], COLS_ID_JOGADOR),
+        _ids(eventos["player_death"], COLS_ATACANTE), _ids(eventos["player_death"], COLS_VITIMA),
+        _ids(eventos["player_hurt"], COLS_ATACANTE), _ids(eventos["player_blind"], COLS_ATACANTE),
+    ]))
+    todos = todos[todos > 0]
+    return {"ids": todos, "jogador": np.arange(len(todos)), "ordem": np.zeros(len(todos), dtype=np.int64),
+            "nomes": list(range(len(todos)))}
+
+
+def _somar(contas, rounds, forma, pesos=None):
+    # matriz contas x rounds somando os eventos válidos (conta conhecida e dentro de um round)
+    validos = (contas >= 0) & (rounds < forma[1])
+    plano = contas[validos] * forma[1] + rounds[validos]
+    pesos = None if pesos is None else np.asarray(pesos, dtype=np.float64)[validos]
+    return np.bincount(plano, weights=pesos, minlength=forma[0] * forma[1]).reshape(forma)
+
+
+def _existe_na_janela(chaves_ordenadas, inicio, fim):
+    # quantas chaves caem em [inicio, fim)
+    return np.searchsorted(chaves_ordenadas, fim, side='left') - np.searchsorted(chaves_ordenadas, inicio, side='left')
+
+
+def _clutches(morte, times):
+    # morte: tick da morte de cada conta em cada round (inf = sobreviveu). Quem fica por último
+    # vivo no time, com pelo menos um inimigo vivo, está num clutch 1vN.
+    contas, rounds = np.nonzero(times > 0)
+    clutch = np.zeros(times.shape, dtype=np.int8)
+    if not len(contas): return clutch
+    base = np.nanmax(np.where(np.isfinite(morte), morte, 0)) + 2
+    tick = np.where(np.isfinite(morte[contas, rounds]), morte[contas, rounds], base - 1)
+    grupo = rounds * 2 + (times[contas, rounds] == 3)
+
+    ordem = np.lexsort((-tick, grupo))
+    grupo_o, tick_o = grupo[ordem], tick[ordem]
+    primeiro = np.r_[True, grupo_o[1:] != grupo_o[:-1]]
+    inicio_grupo = np.maximum.accumulate(np.where(primeiro, np.arange(len(ordem)), 0))
+    tamanho = np.bincount(grupo_o, minlength=grupo_o.max() + 1)[grupo_o]
+    maior = tick_o[inicio_grupo]
+    segundo = np.where(inicio_grupo + 1 < len(ordem), tick_o[np.minimum(inicio_grupo + 1, len(ordem) - 1)], -1)
+    # maior tick de morte entre os outros do time: o momento em que ele ficou sozinho
+    outros = np.where(primeiro, segundo, maior)
+    sozinho = (tamanho >= 2) & (outros < base - 1) & (tick_o > outros)
+
+    chaves = np.sort(grupo.astype(np.float64) * base + tick)
+    inimigo = grupo_o ^ 1
+    vivos = (np.searchsorted(chaves, (inimigo + 1) * base, side='left')
+             - np.searchsorted(chaves, inimigo * base + outros, side='right'))
+    n_inimigos = np.where(sozinho, vivos, 0)
+    clutch[contas[ordem], rounds[ordem]] = np.clip(n_inimigos, 0, 127)
+    return clutch
+
+
+def tabela_rounds(eventos, amigos):
+    df_round, df_death = eventos["round_end"], eventos["player_death"]
+    df_hurt, df_blind = eventos["player_hurt"], eventos["player_blind"]
+    if df_round.empty or not primeira_coluna(df_death, COLS_ATACANTE): return tabela_vazia()
+
+    ordem_rounds = np.argsort(df_round['tick'].to_numpy(dtype=np.int64), kind='stable')
+    fins = df_round['tick'].to_numpy(dtype=np.int64)[ordem_rounds]
+    vencedores = normalizar_times(df_round['winner'])[ordem_rounds] if 'winner' in df_round.columns else np.zeros(len(fins), dtype=np.int8)
+    indice = _indice_partida(eventos)
+    forma = (len(indice["ids"]), len(fins))
+    times = time_por_round(linha_do_tempo(eventos, indice), pd.DataFrame({'tick': fins}), forma[0])
+
+    # mortes em ordem de tick, com o round de cada uma
+    df_death = df_death.sort_values('tick', kind='stable')
+    ticks = df_death['tick'].to_numpy(dtype=np.int64)
+    round_morte = round_do_tick(ticks, fins)
+    atacante, _ = localizar(df_death[primeira_coluna(df_death, COLS_ATACANTE)], indice)
+    col_vitima, col_assist = primeira_coluna(df_death, COLS_VITIMA), primeira_coluna(df_death, COLS_ASSISTENTE)
+    vitima = localizar(df_death[col_vitima], indice)[0] if col_vitima else np.full(len(ticks), -1)
+    assistente = localizar(df_death[col_assist], indice)[0] if col_assist else np.full(len(ticks), -1)
+    headshot = df_death['headshot'].to_numpy(dtype=bool) if 'headshot' in df_death.columns else np.zeros(len(ticks), dtype=bool)
+
+    kills = _somar(atacante, round_morte, forma)
+    deaths = _somar(vitima, round_morte, forma)
+    assists = _somar(assistente, round_morte, forma)
+    headshots = _somar(atacante, round_morte, forma, headshot)
+
+    # abertura: a primeira morte de cada round
+    no_round = round_morte < forma[1]
+    primeiras = np.flatnonzero(no_round)[np.unique(round_morte[no_round], return_index=True)[1]]
+    matou_primeiro = atacante[primeiras] != vitima[primeiras]
+    abertura_kill = _somar(atacante[primeiras][matou_primeiro], round_morte[primeiras][matou_primeiro], forma) > 0
+    abertura_morte = _somar(vitima[primeiras], round_morte[primeiras], forma) > 0
+
+    # trade: matou quem tinha acabado de matar; trocado: quem o matou morreu logo depois
+    base = int(ticks.max()) + JANELA_TRADE + 1 if len(ticks) else 1
+    fora = np.iinfo(np.int64).min
+    por_atacante = np.sort(np.where(atacante >= 0, atacante * base + ticks, fora))
+    por_vitima = np.sort(np.where(vitima >= 0, vitima * base + ticks, fora))
+    valido = (atacante >= 0) & (vitima >= 0) & (atacante != vitima)
+    eh_trade = valido & (_existe_na_janela(por_atacante, vitima * base + ticks - JANELA_TRADE, vitima * base + ticks) > 0)
+    foi_trocado = valido & (_existe_na_janela(por_vitima, atacante * base + ticks + 1, atacante * base + ticks + JANELA_TRADE + 1) > 0)
+    trade_kills = _somar(np.where(eh_trade, atacante, -1), round_morte, forma)
+    trocado = _somar(np.where(foi_trocado, vitima, -1), round_morte, forma) > 0
+
+    morte = np.full(forma, np.inf)
+    morreu = (vitima >= 0) & no_round
+    np.minimum.at(morte, (vitima[morreu], round_morte[morreu]), ticks[morreu])
+
+    col_hurt = primeira_coluna(df_hurt, COLS_ATACANTE)
+    if col_hurt and not df_hurt.empty and 'dmg_health' in df_hurt.columns:
+        conta_hurt = localizar(df_hurt[col_hurt], indice)[0]
+        round_hurt = round_do_tick(df_hurt['tick'].to_numpy(dtype=np.int64), fins)
+        dano_hurt = df_hurt['dmg_health'].to_numpy(dtype=np.float64)
+        dano = _somar(conta_hurt, round_hurt, forma, dano_hurt)
+        util = df_hurt['weapon'].isin(ARMAS_UTILITARIAS).to_numpy() if 'weapon' in df_hurt.columns else np.zeros(len(df_hurt), dtype=bool)
+        dano_util = _somar(conta_hurt, round_hurt, forma, np.where(util, dano_hurt, 0))
+    else: dano = dano_util = np.zeros(forma)
+
+    col_blind = primeira_coluna(df_blind, COLS_ATACANTE)
+    if col_blind and not df_blind.empty:
+        cegos = _somar(localizar(df_blind[col_blind], indice)[0], round_do_tick(df_blind['tick'].to_numpy(dtype=np.int64), fins), forma)
+    else: cegos = np.zeros(forma)
+
+    venceu = (times == vencedores[np.newaxis, :]) & (vencedores[np.newaxis, :] > 0)
+    sobreviveu = ~np.isfinite(morte)
+    kast = (kills > 0) | (assists > 0) | sobreviveu | trocado
+    clutch = _clutches(morte, times)
+
+    # só as contas dos amigos, nos rounds válidos (com vencedor) em que estavam num time;
+    # os eventos de um round sem vencedor (warmup, reinício) ficam nele e não entram
+    amigo, _ = localizar(pd.Series(indice["ids"]), indice_steamids(amigos))
+    numero = np.cumsum(vencedores > 0)
+    contas, rounds = np.nonzero((times > 0) & (amigo[:, np.newaxis] >= 0) & (vencedores > 0)[np.newaxis, :])
+    if not len(contas): return tabela_vazia()
+    nomes = np.array(list(amigos.keys()), dtype=object)
+    tabela = pd.DataFrame({
+        "round": numero[rounds], "nickname": nomes[amigo[contas]], "team": times[contas, rounds],
+        "venceu": venceu[contas, rounds], "dano": dano[contas, rounds], "dano_util": dano_util[contas, rounds],
+        "kills": kills[contas, rounds], "deaths": deaths[contas, rounds], "assists": assists[contas, rounds],
+        "headshots": headshots[contas, rounds], "cegos": cegos[contas, rounds],
+        "abertura_kill": abertura_kill[contas, rounds], "abertura_morte": abertura_morte[contas, rounds],
+        "trade_kills": trade_kills[contas, rounds], "trocado": trocado[contas, rounds],
+        "sobreviveu": sobreviveu[contas, rounds], "kast": kast[contas, rounds],
+        "clutch": clutch[contas, rounds], "clutch_vitoria": (clutch[contas, rounds] > 0) & venceu[contas, rounds],
+    })
+    if tabela.duplicated(["round", "nickname"]).any():
+        # amigo com mais de uma conta na mesma partida: junta as linhas do round
+        regras = {col: ("any" if tipo == "bool" else "sum") for col, tipo in COLUNAS_ROUND.items() if col not in ("round", "nickname")}
+        regras.update({"team": "max", "venceu": "max", "clutch": "max", "sobreviveu": "all"})
+        tabela = tabela.groupby(["round", "nickname"], sort=False).agg(regras).reset_index()
+    tabela = tabela.astype({col: tipo for col, tipo in COLUNAS_ROUND.items() if tipo != "category"})
+    tabela["nickname"] = tabela["nickname"].astype("category")
+    return tabela.sort_values(["round", "nickname"], kind="stable").reset_index(drop=True)
+
+
+def resumo_rounds(tabela):
+    # por jogador: ADR, KAST%, aberturas, trades e clutches ganhos
+    if tabela.empty:
+        return pd.DataFrame(columns=["nickname", "ADR", "KAST", "aberturas", "trade_kills", "clutches"])
+    grupo = tabela.groupby("nickname", observed=True)
+    return pd.DataFrame({
+        "ADR": grupo["dano"].mean(),
+        "KAST": grupo["kast"].mean() * 100,
+        "aberturas": grupo["abertura_kill"].sum(),
+        "trade_kills": grupo["trade_kills"].sum(),
+        "clutches": grupo["clutch_vitoria"].sum(),
+    }).reset_index()
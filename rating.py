@@ -0,0 +1,42 @@
+import numpy as np
+
+# --- RATING PERFORMANCE 2.0 (VETORIZADO) ---
+# Funciona igual para o ranking atual, uma temporada arquivada ou todas as
+# temporadas de uma vez: tudo é aritmética de coluna, sem apply por linha.
+META_PARTIDAS = 50
+
+PESO_ASSIST = 0.4
+PESO_CEGO = 0.2
+PESO_DANO_UTIL = 0.01
+
+
+def _col(df, nome):
+    return df[nome].to_numpy(dtype=float) if nome in df.columns else np.zeros(len(df))
+
+
+def dividir(numerador, denominador, se_zero):
+    return np.where(denominador > 0, numerador / np.where(denominador > 0, denominador, 1), se_zero)
+
+
+def percentual(parte, total):
+    return dividir(parte * 100, total, 0.0)
+
+
+def rating_partida(df):
+    kills, deaths = _col(df, 'kills'), _col(df, 'deaths')
+    return dividir(kills + _col(df, 'assists') * PESO_ASSIST, deaths, kills)
+
+
+def calcular_metricas(df, meta_partidas=META_PARTIDAS):
+    kills, deaths, matches, wins = _col(df, 'kills'), _col(df, 'deaths'), _col(df, 'matches'), _col(df, 'wins')
+    impacto = (kills + _col(df, 'assists') * PESO_ASSIST + _col(df, 'enemies_flashed') * PESO_CEGO
+               + _col(df, 'utility_damage') * PESO_DANO_UTIL)
+
+    df['KD'] = dividir(kills, deaths, kills)
+    df['WinRatePct'] = percentual(wins, matches)
+    df['ADR'] = dividir(_col(df, 'total_damage'), _col(df, 'rounds_played'), 0.0)
+    df['RatingRaw'] = dividir(impacto, deaths, kills)
+    df['Retrospecto'] = wins.astype(int).astype(str).astype(object) + " / " + matches.astype(int).astype(str).astype(object)
+    df['Consistency'] = np.minimum(matches / meta_partidas, 1.0)
+    df['RatingFinal'] = df['RatingRaw'] * df['Consistency']
+    return df
@@ -0,0 +1,86 @@
+# Reconstrói player_stats e player_map_stats a partir do armazém local de eventos,
+# sem reprocessar nenhuma demo. Partidas cujo stats.json já bate com a fórmula e a
+# lista de amigos atuais são reaproveitadas; só as desatualizadas são recalculadas,
+# em paralelo entre processos. As linhas dessas partidas em match_results (rankings por
+# período) são regravadas junto, com a data original.
+# Uso: python recalcular.py [--diretorio dados/eventos] [--workers N] [--seco] [--forcar]
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import armazem_eventos
+import banco
+from estatisticas import calcular_stats
+from jogadores import AMIGOS
+from por_round import tabela_rounds
+
+
+def recalcular_partida(match_hash, amigos, diretorio):
+    mapa_nome, eventos = armazem_eventos.ler_partida(match_hash, diretorio)
+    stats_partida = calcular_stats(eventos, amigos)
+    rounds = tabela_rounds(eventos, amigos) if stats_partida is not None else None
+    armazem_eventos.gravar_stats(match_hash, armazem_eventos.assinatura_stats(amigos), mapa_nome, stats_partida, diretorio, rounds)
+    return match_hash, mapa_nome, stats_partida
+
+
+def recalcular(hashes, amigos, diretorio, workers=None):
+    assinatura = armazem_eventos.assinatura_stats(amigos)
+    partidas, pendentes = {}, []
+    for match_hash in hashes:
+        salvo = armazem_eventos.ler_stats(match_hash, assinatura, diretorio)
+        if salvo: partidas[match_hash] = (salvo["mapa"], salvo["stats"])
+        else: pendentes.append(match_hash)
+
+    if pendentes:
+        workers = workers or min(len(pendentes), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futuros = [executor.submit(recalcular_partida, h, amigos, diretorio) for h in pendentes]
+            for futuro in futuros:
+                match_hash, mapa_nome, stats_partida = futuro.result()
+                partidas[match_hash] = (mapa_nome, stats_partida)
+    # partida em que nenhum jogador da lista atual participou não entra nos totais
+    return {h: p for h, p in partidas.items() if p[1] is not None}, len(pendentes)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recalcula o ranking a partir do armazém de eventos.")
+    ap.add_argument("--diretorio", default=armazem_eventos.DIRETORIO_EVENTOS)
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--seco", action="store_true", help="só calcula e mostra, sem gravar no banco")
+    ap.add_argument("--forcar", action="store_true",
+                    help="grava mesmo com partidas processadas sem eventos no armazém (elas saem do ranking)")
+    args = ap.parse_args()
+
+    from config import criar_banco
+    bd = criar_banco()
+    inicio = time.perf_counter()
+
+    # só entram partidas da temporada atual (processed_matches é zerada ao arquivar)
+    gravadas = set(armazem_eventos.partidas_gravadas(args.diretorio))
+    processadas = bd.hashes_processados()
+    hashes = sorted(gravadas & processadas)
+    faltando = processadas - gravadas
+    if faltando:
+        print(f"⚠️ {len(faltando)} partida(s) processada(s) sem eventos no armazém (anteriores ao armazém, "
+              f"falha ao gravar ou podadas) ficariam de fora do ranking.")
+        if not (args.forcar or args.seco):
+            print("❌ Nada foi gravado. Use --forcar para reconstruir sem elas.")
+            sys.exit(1)
+
+    partidas, recalculadas = recalcular(hashes, AMIGOS, args.diretorio, args.workers)
+    linhas_stats, linhas_mapas = banco.totais_partidas(p for p in partidas.values() if p[1])
+    print(f"{len(partidas)} partidas ({recalculadas} recalculadas, {len(partidas) - recalculadas} reaproveitadas) "
+          f"• {len(linhas_stats)} jogadores • {time.perf_counter() - inicio:.1f}s")
+
+    if args.seco:
+        for linha in sorted(linhas_stats, key=lambda l: l["nickname"]): print(linha)
+        return
+    bd.substituir_estatisticas(linhas_stats, linhas_mapas, hashes, banco.linhas_resultados(partidas))
+    print("✅ player_stats, player_map_stats e match_results da temporada reconstruídas.")
+
+
+if __name__ == "__main__":
+    main()
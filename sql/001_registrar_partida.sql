@@ -0,0 +1,51 @@
+-- Registro atômico de uma partida: marca a demo como processada e soma as
+-- estatísticas de todos os jogadores em uma única chamada (rpc registrar_partida).
+-- Rodar no SQL Editor do Supabase.
+
+create unique index if not exists processed_matches_match_hash_key on processed_matches (match_hash);
+create unique index if not exists player_stats_nickname_key on player_stats (nickname);
+create unique index if not exists player_map_stats_nickname_map_name_key on player_map_stats (nickname, map_name);
+
+create or replace function registrar_partida(p_match_hash text, p_mapa text, p_linhas jsonb)
+returns boolean
+language plpgsql
+as $$
+begin
+    -- a demo só entra uma vez; uploads concorrentes da mesma demo esperam aqui e desistem
+    insert into processed_matches (match_hash) values (p_match_hash)
+    on conflict (match_hash) do nothing;
+    if not found then
+        return false;
+    end if;
+
+    insert into player_stats (nickname, kills, deaths, assists, matches, wins, headshots,
+                              enemies_flashed, utility_damage, total_damage, rounds_played)
+    select l.nickname, l.kills, l.deaths, l.assists, l.matches, l.wins, l.headshots,
+           l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_linhas) as l(nickname text, kills bigint, deaths bigint, assists bigint,
+                                           matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                           utility_damage bigint, total_damage bigint, rounds_played bigint)
+    on conflict (nickname) do update set
+        kills = player_stats.kills + excluded.kills,
+        deaths = player_stats.deaths + excluded.deaths,
+        assists = player_stats.assists + excluded.assists,
+        matches = player_stats.matches + excluded.matches,
+        wins = player_stats.wins + excluded.wins,
+        headshots = player_stats.headshots + excluded.headshots,
+        enemies_flashed = player_stats.enemies_flashed + excluded.enemies_flashed,
+        utility_damage = player_stats.utility_damage + excluded.utility_damage,
+        total_damage = player_stats.total_damage + excluded.total_damage,
+        rounds_played = player_stats.rounds_played + excluded.rounds_played;
+
+    if coalesce(p_mapa, '') <> '' then
+        insert into player_map_stats (nickname, map_name, matches, wins)
+        select l.nickname, p_mapa, 1, case when l.wins > 0 then 1 else 0 end
+        from jsonb_to_recordset(p_linhas) as l(nickname text, wins bigint)
+        on conflict (nickname, map_name) do update set
+            matches = player_map_stats.matches + 1,
+            wins = player_map_stats.wins + excluded.wins;
+    end if;
+
+    return true;
+end;
+$$;
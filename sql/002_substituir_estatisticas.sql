@@ -0,0 +1,24 @@
+-- Troca o conteúdo de player_stats e player_map_stats de uma vez (rpc substituir_estatisticas).
+-- Usado pelo recalcular.py, que reconstrói os totais a partir do armazém local de eventos.
+
+create or replace function substituir_estatisticas(p_stats jsonb, p_mapas jsonb)
+returns void
+language plpgsql
+as $$
+begin
+    delete from player_stats where true;
+    delete from player_map_stats where true;
+
+    insert into player_stats (nickname, kills, deaths, assists, matches, wins, headshots,
+                              enemies_flashed, utility_damage, total_damage, rounds_played)
+    select l.nickname, l.kills, l.deaths, l.assists, l.matches, l.wins, l.headshots,
+           l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_stats) as l(nickname text, kills bigint, deaths bigint, assists bigint,
+                                          matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                          utility_damage bigint, total_damage bigint, rounds_played bigint);
+
+    insert into player_map_stats (nickname, map_name, matches, wins)
+    select l.nickname, l.map_name, l.matches, l.wins
+    from jsonb_to_recordset(p_mapas) as l(nickname text, map_name text, matches bigint, wins bigint);
+end;
+$$;
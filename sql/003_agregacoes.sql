@@ -0,0 +1,28 @@
+-- Agregações feitas no banco para as páginas de Mapas e Histórico: cada página busca
+-- poucas linhas (uma por mapa, por temporada ou por jogador), não as tabelas inteiras.
+-- As views são lidas pela API como tabelas comuns (cliente.table('mapas_totais')...).
+
+create index if not exists history_player_stats_season_name_idx on history_player_stats (season_name);
+create index if not exists player_map_stats_map_name_idx on player_map_stats (map_name);
+
+-- visão geral do grupo: partidas do mapa (maior contagem individual) e totais para o aproveitamento
+create or replace view mapas_totais as
+select map_name, max(matches) as matches, sum(wins) as wins_total, sum(matches) as matches_total
+from player_map_stats
+group by map_name;
+
+create or replace view mapas_jogadores as
+select distinct nickname from player_map_stats;
+
+create or replace view temporadas as
+select distinct season_name from history_player_stats;
+
+-- uma linha por jogador em cada temporada (soma caso a mesma temporada tenha sido arquivada mais de uma vez)
+create or replace view temporada_ranking as
+select season_name, nickname,
+       sum(kills) as kills, sum(deaths) as deaths, sum(assists) as assists,
+       sum(matches) as matches, sum(wins) as wins, sum(headshots) as headshots,
+       sum(enemies_flashed) as enemies_flashed, sum(utility_damage) as utility_damage,
+       sum(total_damage) as total_damage, sum(rounds_played) as rounds_played
+from history_player_stats
+group by season_name, nickname;
@@ -0,0 +1,35 @@
+-- Encerra a temporada em uma única transação (rpc arquivar_temporada): copia player_stats e
+-- player_map_stats para as tabelas history_* com o nome da temporada e zera o ranking.
+-- Ou tudo acontece, ou nada. Repetir a chamada depois de um sucesso (ex.: a resposta se
+-- perdeu na rede) não duplica nada: as tabelas atuais já estão vazias.
+
+create index if not exists history_map_stats_season_name_idx on history_map_stats (season_name);
+
+create or replace function arquivar_temporada(p_season_name text)
+returns integer
+language plpgsql
+as $$
+declare
+    v_jogadores integer;
+begin
+    -- segura novas partidas até o fim: nada registrado entre a cópia e a limpeza se perde
+    lock table processed_matches, player_stats, player_map_stats in share row exclusive mode;
+
+    insert into history_player_stats (season_name, nickname, kills, deaths, assists, matches, wins, headshots,
+                                      enemies_flashed, utility_damage, total_damage, rounds_played)
+    select p_season_name, nickname, kills, deaths, assists, matches, wins, headshots,
+           enemies_flashed, utility_damage, total_damage, rounds_played
+    from player_stats;
+    get diagnostics v_jogadores = row_count;
+
+    insert into history_map_stats (season_name, nickname, map_name, matches, wins)
+    select p_season_name, nickname, map_name, matches, wins
+    from player_map_stats;
+
+    delete from player_stats where true;
+    delete from player_map_stats where true;
+    delete from processed_matches where true;
+
+    return v_jogadores;
+end;
+$$;
@@ -0,0 +1,78 @@
+-- Uma linha por jogador em cada partida (match_hash, nickname, mapa, quando foi jogada),
+-- gravada pela própria registrar_partida. É o que permite os rankings por período
+-- ("últimos 30 dias", "últimas 20 partidas") sem depender do acumulado de player_stats.
+-- Rodar no SQL Editor do Supabase depois do 001.
+
+create table if not exists match_results (
+    id bigint generated always as identity primary key,
+    match_hash text not null,
+    nickname text not null,
+    map_name text,
+    played_at timestamptz not null default now(),
+    kills bigint default 0, deaths bigint default 0, assists bigint default 0,
+    matches bigint default 0, wins bigint default 0, headshots bigint default 0,
+    enemies_flashed bigint default 0, utility_damage bigint default 0,
+    total_damage bigint default 0, rounds_played bigint default 0,
+    unique (match_hash, nickname)
+);
+-- consultas por período (played_at >= ...) e por jogador no período
+create index if not exists match_results_played_at_idx on match_results (played_at);
+create index if not exists match_results_nickname_played_at_idx on match_results (nickname, played_at);
+
+-- a assinatura muda (p_jogada_em), então a versão antiga sai antes
+drop function if exists registrar_partida(text, text, jsonb);
+
+create or replace function registrar_partida(p_match_hash text, p_mapa text, p_linhas jsonb,
+                                             p_jogada_em timestamptz default now())
+returns boolean
+language plpgsql
+as $$
+begin
+    -- a demo só entra uma vez; uploads concorrentes da mesma demo esperam aqui e desistem
+    insert into processed_matches (match_hash) values (p_match_hash)
+    on conflict (match_hash) do nothing;
+    if not found then
+        return false;
+    end if;
+
+    insert into player_stats (nickname, kills, deaths, assists, matches, wins, headshots,
+                              enemies_flashed, utility_damage, total_damage, rounds_played)
+    select l.nickname, l.kills, l.deaths, l.assists, l.matches, l.wins, l.headshots,
+           l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_linhas) as l(nickname text, kills bigint, deaths bigint, assists bigint,
+                                           matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                           utility_damage bigint, total_damage bigint, rounds_played bigint)
+    on conflict (nickname) do update set
+        kills = player_stats.kills + excluded.kills,
+        deaths = player_stats.deaths + excluded.deaths,
+        assists = player_stats.assists + excluded.assists,
+        matches = player_stats.matches + excluded.matches,
+        wins = player_stats.wins + excluded.wins,
+        headshots = player_stats.headshots + excluded.headshots,
+        enemies_flashed = player_stats.enemies_flashed + excluded.enemies_flashed,
+        utility_damage = player_stats.utility_damage + excluded.utility_damage,
+        total_damage = player_stats.total_damage + excluded.total_damage,
+        rounds_played = player_stats.rounds_played + excluded.rounds_played;
+
+    if coalesce(p_mapa, '') <> '' then
+        insert into player_map_stats (nickname, map_name, matches, wins)
+        select l.nickname, p_mapa, 1, case when l.wins > 0 then 1 else 0 end
+        from jsonb_to_recordset(p_linhas) as l(nickname text, wins bigint)
+        on conflict (nickname, map_name) do update set
+            matches = player_map_stats.matches + 1,
+            wins = player_map_stats.wins + excluded.wins;
+    end if;
+
+    -- a mesma demo reenviada depois de arquivar a temporada não duplica os resultados
+    insert into match_results (match_hash, nickname, map_name, played_at, kills, deaths, assists, matches, wins,
+                               headshots, enemies_flashed, utility_damage, total_damage, rounds_played)
+    select p_match_hash, l.nickname, nullif(p_mapa, ''), coalesce(p_jogada_em, now()), l.kills, l.deaths, l.assists,
+           l.matches, l.wins, l.headshots, l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_linhas) as l(nickname text, kills bigint, deaths bigint, assists bigint,
+                                           matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                           utility_damage bigint, total_damage bigint, rounds_played bigint)
+    on conflict (match_hash, nickname) do nothing;
+
+    return true;
+end;
+$$;
@@ -0,0 +1,51 @@
+-- Nova versão da rpc substituir_estatisticas (002): além de player_stats e player_map_stats,
+-- regrava em match_results as linhas das partidas recalculadas, mantendo o played_at e o mapa
+-- que já estavam lá. Partidas sem linha em match_results (de antes do 005) continuam sem.
+-- Rodar no SQL Editor do Supabase depois do 005.
+
+drop function if exists substituir_estatisticas(jsonb, jsonb);
+
+create or replace function substituir_estatisticas(p_stats jsonb, p_mapas jsonb,
+                                                   p_hashes text[] default '{}', p_resultados jsonb default '[]')
+returns void
+language plpgsql
+as $$
+begin
+    delete from player_stats where true;
+    delete from player_map_stats where true;
+
+    insert into player_stats (nickname, kills, deaths, assists, matches, wins, headshots,
+                              enemies_flashed, utility_damage, total_damage, rounds_played)
+    select l.nickname, l.kills, l.deaths, l.assists, l.matches, l.wins, l.headshots,
+           l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_stats) as l(nickname text, kills bigint, deaths bigint, assists bigint,
+                                          matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                          utility_damage bigint, total_damage bigint, rounds_played bigint);
+
+    insert into player_map_stats (nickname, map_name, matches, wins)
+    select l.nickname, l.map_name, l.matches, l.wins
+    from jsonb_to_recordset(p_mapas) as l(nickname text, map_name text, matches bigint, wins bigint);
+
+    -- recalculadas: a data e o mapa vêm das linhas atuais da partida
+    insert into match_results (match_hash, nickname, map_name, played_at, kills, deaths, assists, matches, wins,
+                               headshots, enemies_flashed, utility_damage, total_damage, rounds_played)
+    select l.match_hash, l.nickname, d.map_name, d.played_at, l.kills, l.deaths, l.assists,
+           l.matches, l.wins, l.headshots, l.enemies_flashed, l.utility_damage, l.total_damage, l.rounds_played
+    from jsonb_to_recordset(p_resultados) as l(match_hash text, nickname text, kills bigint, deaths bigint, assists bigint,
+                                               matches bigint, wins bigint, headshots bigint, enemies_flashed bigint,
+                                               utility_damage bigint, total_damage bigint, rounds_played bigint)
+    join (select match_hash, min(map_name) as map_name, min(played_at) as played_at
+          from match_results where match_hash = any(p_hashes) group by match_hash) d on d.match_hash = l.match_hash
+    on conflict (match_hash, nickname) do update set
+        kills = excluded.kills, deaths = excluded.deaths, assists = excluded.assists,
+        matches = excluded.matches, wins = excluded.wins, headshots = excluded.headshots,
+        enemies_flashed = excluded.enemies_flashed, utility_damage = excluded.utility_damage,
+        total_damage = excluded.total_damage, rounds_played = excluded.rounds_played;
+
+    -- jogador que saiu da lista de amigos (ou partida sem nenhum amigo agora) sai dos resultados
+    delete from match_results m
+    where m.match_hash = any(p_hashes)
+      and not exists (select 1 from jsonb_to_recordset(p_resultados) as l(match_hash text, nickname text)
+                      where l.match_hash = m.match_hash and l.nickname = m.nickname);
+end;
+$$;
@@ -0,0 +1,41 @@
+-- Apoio aos rankings por período (janelas.py). O app guarda a soma das partidas de match_results
+-- que já leu e depois só busca as novas; para saber quando uma linha já lida mudou (recalcular.py
+-- regrava match_results), toda alteração ou remoção nela sobe a revisão em match_results_revisao.
+-- A carga inicial fica limitada ao período e às últimas partidas de cada jogador.
+-- Rodar no SQL Editor do Supabase depois do 006.
+
+create table if not exists match_results_revisao (
+    id int primary key default 1 check (id = 1),
+    revisao bigint not null default 0
+);
+insert into match_results_revisao (id) values (1) on conflict (id) do nothing;
+
+create or replace function subir_revisao_resultados()
+returns trigger
+language plpgsql
+as $$
+begin
+    update match_results_revisao set revisao = revisao + 1 where id = 1;
+    return null;
+end;
+$$;
+
+-- inserções (registrar_partida) não mexem no que já foi lido: só update e delete contam
+drop trigger if exists match_results_revisao on match_results;
+create trigger match_results_revisao
+after update or delete on match_results
+for each statement execute function subir_revisao_resultados();
+
+-- as últimas p_partidas de cada jogador, pelo índice (nickname, played_at) do 005
+create or replace function ultimos_resultados(p_partidas int)
+returns setof match_results
+language sql
+stable
+as $$
+    select r.*
+    from (select distinct nickname from match_results) j
+    cross join lateral (select * from match_results m
+                        where m.nickname = j.nickname
+                        order by m.played_at desc
+                        limit p_partidas) r;
+$$;